@@ -1,8 +1,14 @@
 """Windows Monitor API wrapper using pywin32."""
+import copy
 import ctypes
+import itertools
+import logging
+import sys
+import threading
+import time
 from ctypes import wintypes
-from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 # Windows API constants
 ENUM_CURRENT_SETTINGS = -1
@@ -22,6 +28,15 @@ DISP_CHANGE_RESTART = 1
 DISP_CHANGE_FAILED = -1
 DISP_CHANGE_BADMODE = -2
 
+_DISP_CHANGE_ERRORS = {
+    DISP_CHANGE_RESTART: "RESTART required",
+    DISP_CHANGE_FAILED: "FAILED",
+    DISP_CHANGE_BADMODE: "BADMODE - invalid mode",
+}
+
+MONITOR_DEFAULTTOPRIMARY = 0x00000001
+CCHDEVICENAME = 32
+
 DISPLAY_DEVICE_ATTACHED_TO_DESKTOP = 0x00000001
 DISPLAY_DEVICE_PRIMARY_DEVICE = 0x00000004
 DISPLAY_DEVICE_ACTIVE = 0x00000001
@@ -33,6 +48,11 @@ DM_DISPLAYFREQUENCY = 0x00400000
 DM_POSITION = 0x00000020
 DM_DISPLAYORIENTATION = 0x00000080
 
+# Window messages for display change notifications
+WM_SETTINGCHANGE = 0x001A
+WM_DISPLAYCHANGE = 0x007E
+SPI_SETWORKAREA = 0x002F
+
 
 class DEVMODE(ctypes.Structure):
     _fields_ = [
@@ -80,8 +100,116 @@ class DISPLAY_DEVICE(ctypes.Structure):
     ]
 
 
+class DISPLAY_DEVICE_MIN(ctypes.Structure):
+    """DISPLAY_DEVICE without DeviceID/DeviceKey.
+
+    EnumDisplayDevicesW fills only cb bytes, so name/state scans skip the two
+    trailing 128-wchar buffers. DeviceString has to stay because StateFlags
+    follows it in the layout.
+    """
+    _fields_ = [
+        ("cb", wintypes.DWORD),
+        ("DeviceName", wintypes.WCHAR * 32),
+        ("DeviceString", wintypes.WCHAR * 128),
+        ("StateFlags", wintypes.DWORD),
+    ]
+
+
+class MONITORINFOEXW(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("rcMonitor", wintypes.RECT),
+        ("rcWork", wintypes.RECT),
+        ("dwFlags", wintypes.DWORD),
+        ("szDevice", wintypes.WCHAR * CCHDEVICENAME),
+    ]
+
+
+_log = logging.getLogger(__name__)
+
 user32 = ctypes.windll.user32
 
+# Prototyped function pointers, bound once at import. Indexing (rather than
+# attribute access) gives this module its own function pointer objects, so
+# these argtypes can't clash with prototypes set on the shared user32 handle.
+_EnumDisplayDevicesW = user32["EnumDisplayDevicesW"]
+# Pointer argument is untyped so both DISPLAY_DEVICE and DISPLAY_DEVICE_MIN fit
+_EnumDisplayDevicesW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+_EnumDisplayDevicesW.restype = wintypes.BOOL
+
+_EnumDisplaySettingsW = user32["EnumDisplaySettingsW"]
+_EnumDisplaySettingsW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, ctypes.POINTER(DEVMODE)]
+_EnumDisplaySettingsW.restype = wintypes.BOOL
+
+_ChangeDisplaySettingsExW = user32["ChangeDisplaySettingsExW"]
+_ChangeDisplaySettingsExW.argtypes = [wintypes.LPCWSTR, ctypes.POINTER(DEVMODE), wintypes.HWND,
+                                      wintypes.DWORD, wintypes.LPVOID]
+_ChangeDisplaySettingsExW.restype = wintypes.LONG
+
+_SetDisplayConfig = user32["SetDisplayConfig"]
+_SetDisplayConfig.argtypes = [ctypes.c_uint32, ctypes.c_void_p, ctypes.c_uint32,
+                              ctypes.c_void_p, ctypes.c_uint32]
+_SetDisplayConfig.restype = wintypes.LONG
+
+_MonitorFromPoint = user32["MonitorFromPoint"]
+_MonitorFromPoint.argtypes = [wintypes.POINT, wintypes.DWORD]
+_MonitorFromPoint.restype = wintypes.HMONITOR
+
+_GetMonitorInfoW = user32["GetMonitorInfoW"]
+_GetMonitorInfoW.argtypes = [wintypes.HMONITOR, ctypes.POINTER(MONITORINFOEXW)]
+_GetMonitorInfoW.restype = wintypes.BOOL
+
+# A display mode: (width, height, freq, bpp, EnumDisplaySettingsW index)
+DisplayMode = Tuple[int, int, int, int, int]
+
+
+class _ModeTable(NamedTuple):
+    """Enumerated display modes of one device, indexed for lookups."""
+    modes: List[DisplayMode]
+    by_resolution: Dict[Tuple[int, int], List[DisplayMode]]
+    highest: Optional[DisplayMode]  # Most pixels, then highest refresh rate
+
+
+# Display mode cache: device_name -> (timestamp, _ModeTable)
+# Mode lists only change with hardware/driver changes, so a short TTL is safe.
+MODE_CACHE_TTL = 5.0
+_mode_cache: Dict[str, Tuple[float, _ModeTable]] = {}
+
+# Last get_monitors() result, shared by the queries of one UI action
+MONITORS_CACHE_TTL = 0.2
+_monitors_cache = {"monitors": None, "ts": 0.0}
+
+# Last known primary device name; the primary rarely changes within a session
+PRIMARY_CACHE_TTL = 2.0
+_primary_cache = {"name": None, "ts": 0.0}
+
+# Dataclass __slots__ support needs Python 3.10+; older versions keep __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Device names with staged (CDS_NORESET) changes waiting for _commit_batch()
+_pending_changes: List[str] = []
+
+# Set while the display change listener runs; caches then stay valid until
+# Windows reports a change instead of expiring on their TTL
+_listener_active = threading.Event()
+
+
+# Bumped by every mode/primary cache invalidation. A query records it before
+# running and only stores its result if no invalidation landed meanwhile, so a
+# listener-backed (non-expiring) entry can't be stale from the start.
+_invalidations = itertools.count(1)
+_cache_generation = 0
+
+
+def _bump_cache_generation() -> None:
+    global _cache_generation
+    _cache_generation = next(_invalidations)
+
+
+def _cache_is_fresh(timestamp: float, ttl: float) -> bool:
+    """Check whether a cache entry created at timestamp is still usable."""
+    return _listener_active.is_set() or time.monotonic() - timestamp < ttl
+
 
 def detect_displays() -> bool:
     """Detect and attach any physically connected displays.
@@ -93,11 +221,11 @@ def detect_displays() -> bool:
     Returns:
         True if successful, False otherwise
     """
-    result = user32.SetDisplayConfig(0, None, 0, None, SDC_APPLY | SDC_TOPOLOGY_EXTEND)
+    result = _SetDisplayConfig(0, None, 0, None, SDC_APPLY | SDC_TOPOLOGY_EXTEND)
     return result == 0
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class MonitorInfo:
     """Monitor information."""
     device_name: str
@@ -114,27 +242,12 @@ class MonitorInfo:
     enabled: bool = True  # False = disable this monitor
 
     def to_dict(self) -> dict:
-        return {
-            "device_name": self.device_name,
-            "device_string": self.device_string,
-            "width": self.width,
-            "height": self.height,
-            "position_x": self.position_x,
-            "position_y": self.position_y,
-            "refresh_rate": self.refresh_rate,
-            "orientation": self.orientation,
-            "bits_per_pixel": self.bits_per_pixel,
-            "is_primary": self.is_primary,
-            "is_active": self.is_active,
-            "enabled": self.enabled,
-        }
+        return {name: getattr(self, name) for name in _MONITOR_FIELDS}
 
     @classmethod
     def from_dict(cls, data: dict) -> "MonitorInfo":
-        # Handle old profiles without 'enabled' field
-        if "enabled" not in data:
-            data = {**data, "enabled": True}
-        return cls(**data)
+        # Old profiles without 'enabled' fall back to the field default
+        return cls(**{name: data[name] for name in _MONITOR_FIELDS if name in data})
 
     def __str__(self) -> str:
         primary = " [Primary]" if self.is_primary else ""
@@ -142,7 +255,19 @@ class MonitorInfo:
         return f"{self.device_name}{primary}{disabled}: {self.width}x{self.height} @ {self.refresh_rate}Hz, pos({self.position_x}, {self.position_y})"
 
 
-@dataclass
+_MONITOR_FIELDS = tuple(f.name for f in fields(MonitorInfo))
+
+
+# (ApplyResult attribute, message label) in display order
+_RESULT_SECTIONS = (
+    ("applied", "Applied"),
+    ("skipped", "Skipped (not connected)"),
+    ("disabled", "Disabled"),
+    ("failed", "Failed"),
+)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ApplyResult:
     """Result of applying monitor settings."""
     success: bool
@@ -152,33 +277,54 @@ class ApplyResult:
     disabled: List[str] = field(default_factory=list)     # Disabled monitors
 
     def get_message(self) -> str:
-        parts = []
-        if self.applied:
-            parts.append(f"Applied: {', '.join(self.applied)}")
-        if self.skipped:
-            parts.append(f"Skipped (not connected): {', '.join(self.skipped)}")
-        if self.disabled:
-            parts.append(f"Disabled: {', '.join(self.disabled)}")
-        if self.failed:
-            parts.append(f"Failed: {', '.join(self.failed)}")
-        return "\n".join(parts) if parts else "No changes"
+        message = "\n".join(
+            f"{label}: {', '.join(names)}"
+            for label, names in ((label, getattr(self, attr)) for attr, label in _RESULT_SECTIONS)
+            if names
+        )
+        return message or "No changes"
+
+
+def invalidate_monitors_cache() -> None:
+    """Forget the cached get_monitors() result."""
+    _monitors_cache["monitors"] = None
+    _monitors_cache["ts"] = 0.0
 
 
 def get_monitors() -> List[MonitorInfo]:
-    """Get all connected monitors."""
+    """Get all connected monitors.
+
+    Results are reused for MONITORS_CACHE_TTL seconds, so bursts of queries
+    from one user action enumerate once. Callers get their own copies and may
+    modify them freely.
+    """
+    # Always TTL-bound, even while the display listener runs: a query racing
+    # an invalidation could otherwise store a stale layout indefinitely
+    cached = _monitors_cache["monitors"]
+    now = time.monotonic()
+    if cached is None or now - _monitors_cache["ts"] >= MONITORS_CACHE_TTL:
+        cached = _query_monitors()
+        _monitors_cache["monitors"] = cached
+        # Stamp with the query's start time so a racing result expires sooner
+        _monitors_cache["ts"] = now
+    return [copy.copy(m) for m in cached]
+
+
+def _query_monitors() -> List[MonitorInfo]:
+    """Enumerate connected monitors and their current settings."""
     monitors = []
     device = DISPLAY_DEVICE()
     device.cb = ctypes.sizeof(device)
 
     i = 0
-    while user32.EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
+    while _EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
         if device.StateFlags & DISPLAY_DEVICE_ATTACHED_TO_DESKTOP:
             devmode = DEVMODE()
             devmode.dmSize = ctypes.sizeof(devmode)
 
-            if user32.EnumDisplaySettingsW(device.DeviceName, ENUM_CURRENT_SETTINGS, ctypes.byref(devmode)):
+            if _EnumDisplaySettingsW(device.DeviceName, ENUM_CURRENT_SETTINGS, ctypes.byref(devmode)):
                 monitor = MonitorInfo(
-                    device_name=device.DeviceName,
+                    device_name=sys.intern(device.DeviceName),
                     device_string=device.DeviceString,
                     width=devmode.dmPelsWidth,
                     height=devmode.dmPelsHeight,
@@ -196,35 +342,193 @@ def get_monitors() -> List[MonitorInfo]:
     return monitors
 
 
-def get_connected_device_names() -> set:
-    """Get set of currently connected monitor device names (active only)."""
-    names = set()
-    device = DISPLAY_DEVICE()
+def _enumerate_device_state() -> Tuple[set, set, set]:
+    """Enumerate display devices once.
+
+    Returns:
+        (connected, all_devices, primary) sets of device names
+    """
+    connected = set()
+    all_devices = set()
+    primary = set()
+    device = DISPLAY_DEVICE_MIN()
     device.cb = ctypes.sizeof(device)
     i = 0
-    while user32.EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
-        if device.StateFlags & DISPLAY_DEVICE_ATTACHED_TO_DESKTOP:
-            names.add(device.DeviceName)
+    while _EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
+        # Interned: the same few names recur in every set and dict lookup
+        name = sys.intern(device.DeviceName)
+        flags = device.StateFlags
+        all_devices.add(name)
+        if flags & DISPLAY_DEVICE_ATTACHED_TO_DESKTOP:
+            connected.add(name)
+        if flags & DISPLAY_DEVICE_PRIMARY_DEVICE:
+            primary.add(name)
         i += 1
-    return names
+    return connected, all_devices, primary
+
+
+class _LazyDeviceState:
+    """Device name sets, enumerated on first access and then memoized."""
+
+    def __init__(self):
+        self._state: Optional[Tuple[set, set, set]] = None
+
+    def _get(self) -> Tuple[set, set, set]:
+        if self._state is None:
+            self._state = _enumerate_device_state()
+        return self._state
+
+    @property
+    def connected(self) -> set:
+        """Currently active (attached to desktop) device names."""
+        return self._get()[0]
+
+    @property
+    def all_devices(self) -> set:
+        """All display device names, including detached ones."""
+        return self._get()[1]
+
+    @property
+    def primary(self) -> set:
+        """Primary device names."""
+        return self._get()[2]
+
+
+def invalidate_primary_cache() -> None:
+    """Forget the cached primary device name."""
+    _bump_cache_generation()
+    _primary_cache["name"] = None
+    _primary_cache["ts"] = 0.0
+
+
+def _get_primary_device_name() -> Optional[str]:
+    """Get the primary device name from its HMONITOR.
+
+    The primary monitor always contains the desktop origin, so this is one
+    MonitorFromPoint call instead of a walk over every display device.
+    """
+    hmon = _MonitorFromPoint(wintypes.POINT(0, 0), MONITOR_DEFAULTTOPRIMARY)
+    if not hmon:
+        return None
+    mi = MONITORINFOEXW()
+    mi.cbSize = ctypes.sizeof(mi)
+    if not _GetMonitorInfoW(hmon, ctypes.byref(mi)):
+        return None
+    return sys.intern(mi.szDevice) if mi.szDevice else None
+
+
+def _get_primary_device(state: _LazyDeviceState) -> Optional[str]:
+    """Get the primary device name, cached for PRIMARY_CACHE_TTL seconds
+    (or until the display change listener reports a change).
+
+    Falls back to the enumerated device state if the monitor lookup fails.
+    """
+    if _primary_cache["name"] is not None and _cache_is_fresh(_primary_cache["ts"], PRIMARY_CACHE_TTL):
+        return _primary_cache["name"]
+
+    generation = _cache_generation
+    ts = time.monotonic()
+    name = _get_primary_device_name() or next(iter(state.primary), None)
+    if generation == _cache_generation:
+        _primary_cache["name"] = name
+        _primary_cache["ts"] = ts
+    return name
+
+
+def get_connected_device_names() -> set:
+    """Get set of currently connected monitor device names (active only)."""
+    return _enumerate_device_state()[0]
 
 
 def get_all_device_names() -> set:
     """Get set of ALL display device names (including disabled ones)."""
-    names = set()
-    device = DISPLAY_DEVICE()
-    device.cb = ctypes.sizeof(device)
+    return _enumerate_device_state()[1]
+
+
+def invalidate_mode_cache(device_name: Optional[str] = None) -> None:
+    """Drop cached display modes (all devices, or just one).
+
+    Call this when the display topology or drivers are known to have changed.
+    """
+    _bump_cache_generation()
+    if device_name is None:
+        _mode_cache.clear()
+    else:
+        _mode_cache.pop(device_name, None)
+
+
+def _enumerate_modes(device_name: str) -> _ModeTable:
+    """Get all display modes for a device, grouped by resolution.
+
+    Each mode is a (width, height, freq, bpp, index) tuple where index is the
+    EnumDisplaySettingsW mode number. Results are cached per device for
+    MODE_CACHE_TTL seconds, or until the display change listener reports a
+    change.
+    """
+    cached = _mode_cache.get(device_name)
+    if cached is not None and _cache_is_fresh(cached[0], MODE_CACHE_TTL):
+        return cached[1]
+
+    generation = _cache_generation
+    ts = time.monotonic()
+    modes = []
+    by_resolution: Dict[Tuple[int, int], List[DisplayMode]] = {}
+    highest = None
+    highest_key = (0, 0)
+
+    # One scratch buffer for the whole enumeration; only ints are kept
+    scratch = DEVMODE()
+    scratch.dmSize = ctypes.sizeof(scratch)
+    scratch.dmDriverExtra = 0
+
     i = 0
-    while user32.EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
-        # Include all display devices, not just attached ones
-        names.add(device.DeviceName)
+    while _EnumDisplaySettingsW(device_name, i, ctypes.byref(scratch)):
+        mode = (scratch.dmPelsWidth, scratch.dmPelsHeight,
+                scratch.dmDisplayFrequency, scratch.dmBitsPerPel, i)
+        modes.append(mode)
+        by_resolution.setdefault((mode[0], mode[1]), []).append(mode)
+        # Track highest resolution mode for fallback
+        key = (mode[0] * mode[1], mode[2])
+        if key > highest_key:
+            highest_key = key
+            highest = mode
         i += 1
-    return names
+
+    table = _ModeTable(modes, by_resolution, highest)
+    if generation == _cache_generation:
+        _mode_cache[device_name] = (ts, table)
+    return table
+
+
+def _build_devmode(device_name: str, width: int, height: int, freq: int, bpp: int,
+                   index: int) -> DEVMODE:
+    """Materialize the DEVMODE for a cached display mode.
+
+    Fetches the driver's mode by its index so driver-specific fields are kept.
+    If the mode list changed since it was cached, builds the DEVMODE from the
+    cached values instead.
+    """
+    devmode = DEVMODE()
+    devmode.dmSize = ctypes.sizeof(devmode)
+    if (_EnumDisplaySettingsW(device_name, index, ctypes.byref(devmode))
+            and devmode.dmPelsWidth == width and devmode.dmPelsHeight == height
+            and devmode.dmDisplayFrequency == freq and devmode.dmBitsPerPel == bpp):
+        return devmode
+
+    devmode = DEVMODE()
+    devmode.dmSize = ctypes.sizeof(devmode)
+    devmode.dmPelsWidth = width
+    devmode.dmPelsHeight = height
+    devmode.dmDisplayFrequency = freq
+    devmode.dmBitsPerPel = bpp
+    devmode.dmFields = DM_PELSWIDTH | DM_PELSHEIGHT | DM_DISPLAYFREQUENCY | DM_BITSPERPEL
+    return devmode
 
 
 def get_best_display_mode(device_name: str, target_width: int, target_height: int,
                           target_refresh: int, is_rotated: bool = False,
-                          fallback_to_any: bool = True) -> Optional[DEVMODE]:
+                          fallback_to_any: bool = True,
+                          cached_modes: Optional[_ModeTable] = None) -> Optional[DEVMODE]:
     """Find the best matching display mode for a device.
 
     Args:
@@ -234,14 +538,13 @@ def get_best_display_mode(device_name: str, target_width: int, target_height: in
         target_refresh: Desired refresh rate
         is_rotated: If True, width/height are swapped (portrait mode)
         fallback_to_any: If True, return highest available mode if exact not found
+        cached_modes: Mode table from _enumerate_modes(); enumerated if None
 
     Returns:
         DEVMODE with matching mode, or best available if fallback enabled
     """
-    best_mode = None
-    best_score = -1
-    highest_mode = None
-    highest_pixels = 0
+    if cached_modes is None:
+        cached_modes = _enumerate_modes(device_name)
 
     # For rotated displays, we need to search for the native (unrotated) resolution
     search_width = target_width
@@ -250,65 +553,99 @@ def get_best_display_mode(device_name: str, target_width: int, target_height: in
         search_width = target_height
         search_height = target_width
 
-    devmode = DEVMODE()
-    devmode.dmSize = ctypes.sizeof(devmode)
-
-    i = 0
-    while user32.EnumDisplaySettingsW(device_name, i, ctypes.byref(devmode)):
-        pixels = devmode.dmPelsWidth * devmode.dmPelsHeight
-
-        # Track highest resolution mode for fallback
-        if pixels > highest_pixels or (pixels == highest_pixels and
-                                        devmode.dmDisplayFrequency > (highest_mode.dmDisplayFrequency if highest_mode else 0)):
-            highest_pixels = pixels
-            highest_mode = DEVMODE()
-            highest_mode.dmSize = ctypes.sizeof(highest_mode)
-            ctypes.memmove(ctypes.byref(highest_mode), ctypes.byref(devmode), ctypes.sizeof(devmode))
-
-        # Check for exact match or rotated match
-        exact_match = (devmode.dmPelsWidth == target_width and devmode.dmPelsHeight == target_height)
-        native_match = (devmode.dmPelsWidth == search_width and devmode.dmPelsHeight == search_height)
-
-        if exact_match or native_match:
-            score = 1000 if exact_match else 900
-            if devmode.dmDisplayFrequency == target_refresh:
-                score += 100
-            else:
-                score += max(0, 50 - abs(devmode.dmDisplayFrequency - target_refresh))
+    # Only modes at the exact or native resolution can match; the table
+    # groups them, so there is no scan over every mode
+    by_resolution = cached_modes.by_resolution
+    candidates = by_resolution.get((target_width, target_height), [])
+    if (search_width, search_height) != (target_width, target_height):
+        native = by_resolution.get((search_width, search_height))
+        if native:
+            # Keep enumeration order so ties resolve as in a full scan
+            candidates = sorted(candidates + native, key=lambda m: m[4])
 
-            if score > best_score:
-                best_score = score
-                best_mode = DEVMODE()
-                best_mode.dmSize = ctypes.sizeof(best_mode)
-                ctypes.memmove(ctypes.byref(best_mode), ctypes.byref(devmode), ctypes.sizeof(devmode))
-
-        i += 1
-        devmode = DEVMODE()
-        devmode.dmSize = ctypes.sizeof(devmode)
+    best_mode = None
+    best_score = -1
+    for mode in candidates:
+        freq = mode[2]
+        exact = mode[0] == target_width and mode[1] == target_height
+        # Resolution base score plus refresh rate bonus
+        score = (1000 if exact else 900) + (
+            100 if freq == target_refresh else max(0, 50 - abs(freq - target_refresh)))
+        if score > best_score:
+            best_score = score
+            best_mode = mode
 
     # Return best exact match, or fallback to highest available
+    highest_mode = cached_modes.highest
     if best_mode:
-        return best_mode
+        return _build_devmode(device_name, *best_mode)
     elif fallback_to_any and highest_mode:
-        print(f"  Warning: {target_width}x{target_height} not available, using {highest_mode.dmPelsWidth}x{highest_mode.dmPelsHeight}")
-        return highest_mode
+        _log.warning("%dx%d not available, using %dx%d",
+                     target_width, target_height, highest_mode[0], highest_mode[1])
+        return _build_devmode(device_name, *highest_mode)
     return None
 
 
-def enable_monitor(device_name: str, monitor: 'MonitorInfo', use_noreset: bool = False) -> bool:
+def _stage_devmode(device_name: str, devmode: DEVMODE, flags: int = 0) -> int:
+    """Stage a display change without applying it.
+
+    Always uses CDS_UPDATEREGISTRY | CDS_NORESET; call _commit_batch() to
+    apply all staged changes with a single mode set.
+
+    Returns:
+        The ChangeDisplaySettingsExW result code
+    """
+    result = _ChangeDisplaySettingsExW(
+        device_name,
+        ctypes.byref(devmode),
+        None,
+        flags | CDS_UPDATEREGISTRY | CDS_NORESET,
+        None
+    )
+    if result == DISP_CHANGE_SUCCESSFUL:
+        _pending_changes.append(device_name)
+    return result
+
+
+def _commit_batch() -> bool:
+    """Apply all staged display changes at once.
+
+    Returns:
+        True if there was nothing to apply or the commit succeeded
+    """
+    if not _pending_changes:
+        return True
+    _pending_changes.clear()
+    result = _ChangeDisplaySettingsExW(None, None, None, 0, None)
+    # The primary may have moved (CDS_SET_PRIMARY or a detached monitor)
+    invalidate_primary_cache()
+    invalidate_monitors_cache()
+    return result == DISP_CHANGE_SUCCESSFUL
+
+
+def enable_monitor(device_name: str, monitor: 'MonitorInfo', use_noreset: bool = False,
+                   mode_cache: Optional[Dict[str, _ModeTable]] = None) -> bool:
     """Enable a disabled monitor with the specified settings (Extend desktop).
 
     Args:
         device_name: The device name (e.g., \\\\.\\DISPLAY1)
         monitor: MonitorInfo with desired settings
         use_noreset: If True, don't apply immediately (for batch operations)
+        mode_cache: Optional device_name -> mode table dict shared across calls
+                    (filled lazily), so each device is enumerated at most once
     """
     # Check if monitor is rotated (portrait mode - height > width)
     is_rotated = monitor.height > monitor.width or monitor.orientation in (1, 3)
 
     # First, try to find a valid display mode for this monitor
+    cached_modes = None
+    if mode_cache is not None:
+        cached_modes = mode_cache.get(device_name)
+        if cached_modes is None:
+            cached_modes = mode_cache[device_name] = _enumerate_modes(device_name)
     best_mode = get_best_display_mode(device_name, monitor.width, monitor.height,
-                                       monitor.refresh_rate, is_rotated=is_rotated)
+                                       monitor.refresh_rate, is_rotated=is_rotated,
+                                       cached_modes=cached_modes)
 
     if best_mode:
         devmode = best_mode
@@ -339,33 +676,18 @@ def enable_monitor(device_name: str, monitor: 'MonitorInfo', use_noreset: bool =
     devmode.dmFields = (DM_PELSWIDTH | DM_PELSHEIGHT | DM_POSITION |
                        DM_DISPLAYFREQUENCY | DM_DISPLAYORIENTATION | DM_BITSPERPEL)
 
-    flags = CDS_UPDATEREGISTRY
-    if use_noreset:
-        flags |= CDS_NORESET
-    if monitor.is_primary:
-        flags |= CDS_SET_PRIMARY
-
-    result = user32.ChangeDisplaySettingsExW(
-        device_name,
-        ctypes.byref(devmode),
-        None,
-        flags,
-        None
-    )
+    flags = CDS_SET_PRIMARY if monitor.is_primary else 0
+    result = _stage_devmode(device_name, devmode, flags)
 
     if result != DISP_CHANGE_SUCCESSFUL:
-        error_msgs = {
-            DISP_CHANGE_RESTART: "RESTART required",
-            DISP_CHANGE_FAILED: "FAILED",
-            DISP_CHANGE_BADMODE: "BADMODE - invalid mode",
-        }
-        print(f"enable_monitor({device_name}): {error_msgs.get(result, f'error {result}')}")
-        print(f"  Attempted: {devmode.dmPelsWidth}x{devmode.dmPelsHeight} @ {devmode.dmDisplayFrequency}Hz")
-        print(f"  Position: ({devmode.dmPositionX}, {devmode.dmPositionY})")
+        _log.warning("enable_monitor(%s): %s", device_name, _DISP_CHANGE_ERRORS.get(result, result))
+        _log.debug("  Attempted: %dx%d @ %dHz, position (%d, %d)",
+                   devmode.dmPelsWidth, devmode.dmPelsHeight, devmode.dmDisplayFrequency,
+                   devmode.dmPositionX, devmode.dmPositionY)
 
     # If not using noreset, apply immediately
     if not use_noreset and result == DISP_CHANGE_SUCCESSFUL:
-        user32.ChangeDisplaySettingsExW(None, None, None, 0, None)
+        _commit_batch()
 
     return result == DISP_CHANGE_SUCCESSFUL
 
@@ -378,40 +700,57 @@ def disable_monitor(device_name: str, use_noreset: bool = False) -> bool:
         use_noreset: If True, don't apply immediately (for batch operations)
 
     WARNING: Cannot disable the primary monitor.
+    The caller is expected to pass an existing device; an unknown name simply
+    fails in ChangeDisplaySettingsExW.
     """
+    # Detaching only needs zero width/height/position; a fresh DEVMODE is
+    # already zeroed, so there is no need to read the current settings.
     devmode = DEVMODE()
     devmode.dmSize = ctypes.sizeof(devmode)
-
-    # Get current settings first
-    if not user32.EnumDisplaySettingsW(device_name, ENUM_CURRENT_SETTINGS, ctypes.byref(devmode)):
-        return False
-
-    # Set position to detach from desktop (key: set width/height to 0)
-    devmode.dmPelsWidth = 0
-    devmode.dmPelsHeight = 0
-    devmode.dmPositionX = 0
-    devmode.dmPositionY = 0
     devmode.dmFields = DM_PELSWIDTH | DM_PELSHEIGHT | DM_POSITION
 
-    flags = CDS_UPDATEREGISTRY
-    if use_noreset:
-        flags |= CDS_NORESET
-
-    result = user32.ChangeDisplaySettingsExW(
-        device_name,
-        ctypes.byref(devmode),
-        None,
-        flags,
-        None
-    )
+    result = _stage_devmode(device_name, devmode)
 
     # If not using noreset, apply immediately
     if not use_noreset and result == DISP_CHANGE_SUCCESSFUL:
-        user32.ChangeDisplaySettingsExW(None, None, None, 0, None)
+        _commit_batch()
 
     return result == DISP_CHANGE_SUCCESSFUL
 
 
+def _set_monitor_fields(devmode: DEVMODE, monitor: MonitorInfo) -> None:
+    """Copy a monitor's mode, position and orientation into a DEVMODE."""
+    devmode.dmPelsWidth = monitor.width
+    devmode.dmPelsHeight = monitor.height
+    devmode.dmPositionX = monitor.position_x
+    devmode.dmPositionY = monitor.position_y
+    devmode.dmDisplayFrequency = monitor.refresh_rate
+    devmode.dmDisplayOrientation = monitor.orientation
+    devmode.dmBitsPerPel = monitor.bits_per_pixel
+    devmode.dmFields = (DM_PELSWIDTH | DM_PELSHEIGHT | DM_POSITION |
+                        DM_DISPLAYFREQUENCY | DM_DISPLAYORIENTATION | DM_BITSPERPEL)
+
+
+# apply_monitor_settings() actions, run in _ACTION_PHASE order
+_ACTION_SKIP = 0             # Device not present
+_ACTION_KEEP_DISABLED = 1    # Disabled in profile and already off
+_ACTION_PRIMARY_LOCKED = 2   # Disabled in profile but primary
+_ACTION_DISABLE = 3
+_ACTION_DISABLE_EXTRA = 4    # Connected but not in profile (disable_extra)
+_ACTION_REENABLE = 5
+_ACTION_CONFIGURE = 6
+
+_ACTION_PHASE = {
+    _ACTION_SKIP: 0,
+    _ACTION_KEEP_DISABLED: 0,
+    _ACTION_PRIMARY_LOCKED: 0,
+    _ACTION_DISABLE: 0,
+    _ACTION_DISABLE_EXTRA: 1,
+    _ACTION_REENABLE: 2,
+    _ACTION_CONFIGURE: 2,
+}
+
+
 def apply_monitor_settings(monitors: List[MonitorInfo], disable_extra: bool = False) -> ApplyResult:
     """Apply monitor settings with detailed result reporting.
 
@@ -429,134 +768,138 @@ def apply_monitor_settings(monitors: List[MonitorInfo], disable_extra: bool = Fa
         disable_extra: If True, disable monitors not in the profile
     """
     result = ApplyResult(success=True)
+    # (category, name) outcomes, grouped into the result lists once at the end.
+    # The set mirrors the list so duplicates are rejected in O(1).
+    events: List[Tuple[str, str]] = []
+    seen_events: set = set()
 
-    # Get current state BEFORE detection (fast - just device enumeration)
-    connected = get_connected_device_names()  # Currently active monitors
-    all_devices = get_all_device_names()       # All monitors including disabled
-    profile_device_names = {m.device_name for m in monitors}
+    def record(category: str, name: str) -> None:
+        event = (category, name)
+        if event not in seen_events:
+            seen_events.add(event)
+            events.append(event)
+
+    # Device state is enumerated once, on first access. Classification below
+    # always reads it, so this only defers the walk; it does not skip it.
+    state = _LazyDeviceState()
 
     # Only call detect_displays() when we need to re-enable a disabled monitor.
     # This saves 1-3 seconds on every apply that doesn't need re-enabling.
     needs_reenable = any(
-        m.enabled and m.device_name not in connected and m.device_name in all_devices
+        m.enabled and m.device_name not in state.connected and m.device_name in state.all_devices
         for m in monitors
     )
-    if needs_reenable:
-        detect_displays()
-        # Re-query after detection since new monitors may have appeared
-        connected = get_connected_device_names()
-        all_devices = get_all_device_names()
 
-    # Determine primary from connected set (avoids full get_monitors() call)
-    # We only need to know which device is primary to prevent disabling it.
-    _primary_devices = set()
-    device = DISPLAY_DEVICE()
-    device.cb = ctypes.sizeof(device)
-    _i = 0
-    while user32.EnumDisplayDevicesW(None, _i, ctypes.byref(device), 0):
-        if device.StateFlags & DISPLAY_DEVICE_PRIMARY_DEVICE:
-            _primary_devices.add(device.DeviceName)
-        _i += 1
-    primary_devices = _primary_devices
-
-    # First: disable monitors marked as disabled in the profile
-    for monitor in monitors:
-        if monitor.device_name not in all_devices:
-            result.skipped.append(monitor.device_name)
-            continue
-
-        if not monitor.enabled:
-            if monitor.device_name not in connected:
-                # Already disabled
-                result.disabled.append(monitor.device_name)
-                continue
-
-            # Check if it's the primary monitor - can't disable primary
-            if monitor.device_name in primary_devices:
-                result.failed.append(f"{monitor.device_name} (primary cannot be disabled)")
-                continue
-
-            if disable_monitor(monitor.device_name, use_noreset=True):
-                result.disabled.append(monitor.device_name)
-            else:
-                result.failed.append(monitor.device_name)
-                result.success = False
+    # detect_displays() blocks while Windows scans hardware, so run it in the
+    # background and overlap it with the read-only preparation below
+    detect_thread = None
+    if needs_reenable:
+        detect_thread = threading.Thread(target=detect_displays, daemon=True)
+        detect_thread.start()
 
-    # Second: disable extra monitors not in the profile (if option enabled)
-    if disable_extra:
-        for device_name in connected:
-            if device_name not in profile_device_names:
-                if device_name in primary_devices:
-                    # Can't disable primary monitor
-                    continue
-                if disable_monitor(device_name, use_noreset=True):
-                    result.disabled.append(device_name)
+    profile_device_names = {m.device_name for m in monitors}
+    # Extending the desktop never changes the primary, so resolve it now
+    primary_device = _get_primary_device(state)
 
-    # Third: configure enabled monitors (including re-enabling disabled ones)
-    for monitor in monitors:
-        if monitor.device_name not in all_devices:
-            continue  # Already marked as skipped above
+    if detect_thread is not None:
+        detect_thread.join()
+        invalidate_mode_cache()
+        invalidate_monitors_cache()
+        # Re-query after detection since new monitors may have appeared
+        state = _LazyDeviceState()
 
-        if not monitor.enabled:
-            continue  # Already handled above
+    connected = state.connected
+    all_devices = state.all_devices
 
-        # Check if monitor is currently disabled (not in connected but in all_devices)
-        is_currently_disabled = monitor.device_name not in connected
+    # Classify every monitor once, then run the actions phase by phase:
+    # disables first, then extra disables, then configure/re-enable.
+    actions: List[Tuple[int, str, Optional[MonitorInfo]]] = []
+    for monitor in monitors:
+        name = monitor.device_name
+        if name not in all_devices:
+            actions.append((_ACTION_SKIP, name, monitor))
+        elif monitor.enabled:
+            action = _ACTION_CONFIGURE if name in connected else _ACTION_REENABLE
+            actions.append((action, name, monitor))
+        elif name not in connected:
+            actions.append((_ACTION_KEEP_DISABLED, name, monitor))
+        elif name == primary_device:
+            # Can't disable primary
+            actions.append((_ACTION_PRIMARY_LOCKED, name, monitor))
+        else:
+            actions.append((_ACTION_DISABLE, name, monitor))
 
-        if is_currently_disabled:
+    if disable_extra:
+        for name in connected:
+            # Never disable the primary monitor
+            if name not in profile_device_names and name != primary_device:
+                actions.append((_ACTION_DISABLE_EXTRA, name, None))
+
+    # Stable sort keeps profile order within each phase
+    actions.sort(key=lambda entry: _ACTION_PHASE[entry[0]])
+
+    mode_cache: Dict[str, _ModeTable] = {}  # Shared by every enable_monitor call below
+    for action, name, monitor in actions:
+        if action == _ACTION_SKIP:
+            record("skipped", name)
+        elif action == _ACTION_KEEP_DISABLED:
+            record("disabled", name)
+        elif action == _ACTION_PRIMARY_LOCKED:
+            record("failed", f"{name} (primary cannot be disabled)")
+        elif action == _ACTION_DISABLE:
+            if disable_monitor(name, use_noreset=True):
+                record("disabled", name)
+            else:
+                record("failed", name)
+                result.success = False
+        elif action == _ACTION_DISABLE_EXTRA:
+            if disable_monitor(name, use_noreset=True):
+                record("disabled", name)
+        elif action == _ACTION_REENABLE:
             # Re-enable the monitor with the profile settings
-            if enable_monitor(monitor.device_name, monitor, use_noreset=True):
-                result.applied.append(f"{monitor.device_name} (re-enabled)")
+            if enable_monitor(name, monitor, use_noreset=True, mode_cache=mode_cache):
+                record("applied", f"{name} (re-enabled)")
             else:
-                result.failed.append(f"{monitor.device_name} (failed to enable)")
+                record("failed", f"{name} (failed to enable)")
                 result.success = False
         else:
-            # Normal case: configure active monitor
+            # Configure an active monitor. Every field we change is set
+            # explicitly, so no current-settings base is needed.
             devmode = DEVMODE()
             devmode.dmSize = ctypes.sizeof(devmode)
-
-            # Get current settings as base
-            if not user32.EnumDisplaySettingsW(monitor.device_name, ENUM_CURRENT_SETTINGS, ctypes.byref(devmode)):
-                if monitor.device_name not in result.skipped:
-                    result.skipped.append(monitor.device_name)
-                continue
-
-            # Set new values
-            devmode.dmPelsWidth = monitor.width
-            devmode.dmPelsHeight = monitor.height
-            devmode.dmPositionX = monitor.position_x
-            devmode.dmPositionY = monitor.position_y
-            devmode.dmDisplayFrequency = monitor.refresh_rate
-            devmode.dmDisplayOrientation = monitor.orientation
-            devmode.dmBitsPerPel = monitor.bits_per_pixel
-
-            devmode.dmFields = (DM_PELSWIDTH | DM_PELSHEIGHT | DM_POSITION |
-                              DM_DISPLAYFREQUENCY | DM_DISPLAYORIENTATION | DM_BITSPERPEL)
-
-            # Apply with NORESET flag (don't apply yet)
-            flags = CDS_UPDATEREGISTRY | CDS_NORESET
-            if monitor.is_primary:
-                flags |= CDS_SET_PRIMARY
-
-            change_result = user32.ChangeDisplaySettingsExW(
-                monitor.device_name,
-                ctypes.byref(devmode),
-                None,
-                flags,
-                None
-            )
+            _set_monitor_fields(devmode, monitor)
+
+            # Stage only (applied by the final commit)
+            flags = CDS_SET_PRIMARY if monitor.is_primary else 0
+            change_result = _stage_devmode(name, devmode, flags)
+
+            if change_result == DISP_CHANGE_BADMODE:
+                # Rare: retry on top of the current settings
+                devmode = DEVMODE()
+                devmode.dmSize = ctypes.sizeof(devmode)
+                if not _EnumDisplaySettingsW(name, ENUM_CURRENT_SETTINGS, ctypes.byref(devmode)):
+                    record("skipped", name)
+                    continue
+                _set_monitor_fields(devmode, monitor)
+                change_result = _stage_devmode(name, devmode, flags)
 
             if change_result == DISP_CHANGE_SUCCESSFUL:
-                result.applied.append(monitor.device_name)
+                record("applied", name)
             else:
-                result.failed.append(monitor.device_name)
+                record("failed", name)
                 result.success = False
 
-    # Final pass: apply all pending changes
-    if result.applied or result.disabled:
-        final_result = user32.ChangeDisplaySettingsExW(None, None, None, 0, None)
-        if final_result != DISP_CHANGE_SUCCESSFUL:
-            result.success = False
+    # Final pass: apply all staged changes with a single mode set
+    if not _commit_batch():
+        result.success = False
+
+    grouped: Dict[str, List[str]] = {}
+    for category, name in events:
+        grouped.setdefault(category, []).append(name)
+    result.applied = grouped.get("applied", [])
+    result.skipped = grouped.get("skipped", [])
+    result.failed = grouped.get("failed", [])
+    result.disabled = grouped.get("disabled", [])
 
     return result
 
@@ -573,14 +916,14 @@ def get_all_display_devices() -> List[dict]:
     device.cb = ctypes.sizeof(device)
 
     i = 0
-    while user32.EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
+    while _EnumDisplayDevicesW(None, i, ctypes.byref(device), 0):
         attached = bool(device.StateFlags & DISPLAY_DEVICE_ATTACHED_TO_DESKTOP)
         primary = bool(device.StateFlags & DISPLAY_DEVICE_PRIMARY_DEVICE)
 
         # Check if there are valid display modes
         devmode = DEVMODE()
         devmode.dmSize = ctypes.sizeof(devmode)
-        has_modes = user32.EnumDisplaySettingsW(device.DeviceName, 0, ctypes.byref(devmode))
+        has_modes = _EnumDisplaySettingsW(device.DeviceName, 0, ctypes.byref(devmode))
 
         devices.append({
             "name": device.DeviceName,
@@ -595,12 +938,135 @@ def get_all_display_devices() -> List[dict]:
     return devices
 
 
+# --- Display change listener ---
+
+WNDPROC = ctypes.WINFUNCTYPE(wintypes.LPARAM, wintypes.HWND, wintypes.UINT,
+                             wintypes.WPARAM, wintypes.LPARAM)
+
+
+class WNDCLASSEXW(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.UINT),
+        ("style", wintypes.UINT),
+        ("lpfnWndProc", WNDPROC),
+        ("cbClsExtra", ctypes.c_int),
+        ("cbWndExtra", ctypes.c_int),
+        ("hInstance", wintypes.HINSTANCE),
+        ("hIcon", wintypes.HICON),
+        ("hCursor", wintypes.HANDLE),
+        ("hbrBackground", wintypes.HBRUSH),
+        ("lpszMenuName", wintypes.LPCWSTR),
+        ("lpszClassName", wintypes.LPCWSTR),
+        ("hIconSm", wintypes.HICON),
+    ]
+
+
+# Private function pointers (see above): pystray prototypes several of these
+# on the shared handles with different types (e.g. an ATOM class name).
+_DefWindowProcW = user32["DefWindowProcW"]
+_DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+_DefWindowProcW.restype = wintypes.LPARAM
+
+_CreateWindowExW = user32["CreateWindowExW"]
+_CreateWindowExW.argtypes = [
+    wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+    ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+    wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+]
+_CreateWindowExW.restype = wintypes.HWND
+
+_RegisterClassExW = user32["RegisterClassExW"]
+_RegisterClassExW.argtypes = [ctypes.POINTER(WNDCLASSEXW)]
+_RegisterClassExW.restype = wintypes.ATOM
+
+_GetMessageW = user32["GetMessageW"]
+_GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+_GetMessageW.restype = wintypes.BOOL
+
+_TranslateMessage = user32["TranslateMessage"]
+_TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_TranslateMessage.restype = wintypes.BOOL
+
+_DispatchMessageW = user32["DispatchMessageW"]
+_DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_DispatchMessageW.restype = wintypes.LPARAM
+
+_GetModuleHandleW = ctypes.windll.kernel32["GetModuleHandleW"]
+_GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+_GetModuleHandleW.restype = wintypes.HMODULE
+
+_listener_thread: Optional[threading.Thread] = None
+
+
+def invalidate_display_caches() -> None:
+    """Drop every cached display query (modes, primary device, monitors)."""
+    invalidate_mode_cache()
+    invalidate_primary_cache()
+    invalidate_monitors_cache()
+
+
+def _listener_wndproc(hwnd, msg, wparam, lparam):
+    if msg == WM_DISPLAYCHANGE or (msg == WM_SETTINGCHANGE and wparam == SPI_SETWORKAREA):
+        invalidate_display_caches()
+    return _DefWindowProcW(hwnd, msg, wparam, lparam)
+
+
+# Keep the callback alive for the lifetime of the window class
+_listener_wndproc_ptr = WNDPROC(_listener_wndproc)
+
+
+def _run_display_listener() -> None:
+    """Create a hidden window and pump its messages (runs on its own thread)."""
+    class_name = "DisplaySnapDisplayListener"
+    hinstance = _GetModuleHandleW(None)
+
+    wc = WNDCLASSEXW()
+    wc.cbSize = ctypes.sizeof(wc)
+    wc.lpfnWndProc = _listener_wndproc_ptr
+    wc.hInstance = hinstance
+    wc.lpszClassName = class_name
+    _RegisterClassExW(ctypes.byref(wc))
+
+    # A hidden top-level window rather than HWND_MESSAGE: message-only
+    # windows don't receive broadcasts such as WM_DISPLAYCHANGE.
+    hwnd = _CreateWindowExW(0, class_name, class_name, 0, 0, 0, 0, 0,
+                            None, None, hinstance, None)
+    if not hwnd:
+        return
+
+    _listener_active.set()
+    try:
+        msg = wintypes.MSG()
+        msg_ref = ctypes.byref(msg)
+        while _GetMessageW(msg_ref, None, 0, 0) > 0:
+            _TranslateMessage(msg_ref)
+            _DispatchMessageW(msg_ref)
+    finally:
+        _listener_active.clear()
+
+
+def start_display_change_listener() -> None:
+    """Start invalidating display caches on WM_DISPLAYCHANGE (idempotent).
+
+    While the listener runs, cached modes and primary device stay valid until
+    Windows reports a display or work area change.
+    """
+    global _listener_thread
+    if _listener_thread is not None and _listener_thread.is_alive():
+        return
+    _listener_thread = threading.Thread(target=_run_display_listener, daemon=True)
+    _listener_thread.start()
+
+
 if __name__ == "__main__":
-    # Comprehensive test
+    # Comprehensive test (one device enumeration + one monitor enumeration)
+    devices = get_all_display_devices()
+    monitors_by_name = {m.device_name: m for m in get_monitors()}
+
     print("=" * 60)
     print("ALL DISPLAY DEVICES (including disabled):")
     print("=" * 60)
-    for dev in get_all_display_devices():
+    for dev in devices:
         status = []
         if dev["attached"]:
             status.append("ATTACHED")
@@ -619,9 +1085,11 @@ if __name__ == "__main__":
     print("=" * 60)
     print("ACTIVE MONITORS:")
     print("=" * 60)
-    for m in get_monitors():
-        print(f"  {m}")
+    for dev in devices:
+        m = monitors_by_name.get(dev["name"])
+        if m is not None:
+            print(f"  {m}")
 
     print()
-    print("Connected (active):", get_connected_device_names())
-    print("All devices:", get_all_device_names())
+    print("Connected (active):", {dev["name"] for dev in devices if dev["attached"]})
+    print("All devices:", {dev["name"] for dev in devices})
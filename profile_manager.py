@@ -1,17 +1,35 @@
 """Profile management for monitor configurations."""
+import atexit
+import hashlib
+import itertools
 import json
+import mmap
 import os
+import sys
+import threading
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-from monitor_api import MonitorInfo, ApplyResult, get_monitors, apply_monitor_settings
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib json module is the fallback
+    orjson = None
+
+from monitor_api import (
+    MonitorInfo, ApplyResult, get_monitors, apply_monitor_settings,
+)
 import window_manager
 
+# Dataclass __slots__ support needs Python 3.10+; older versions keep __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
+@lru_cache(maxsize=1)
 def get_config_dir() -> Path:
-    """Get the configuration directory."""
+    """Get the configuration directory (created once per process)."""
     appdata = os.environ.get("APPDATA", os.path.expanduser("~"))
     config_dir = Path(appdata) / "DisplaySnap"
     config_dir.mkdir(parents=True, exist_ok=True)
@@ -23,29 +41,131 @@ def get_profiles_path() -> Path:
     return get_config_dir() / "profiles.json"
 
 
-@dataclass
+def _dumps(data: dict, pretty: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON, using orjson when available.
+
+    Args:
+        data: Data to serialize
+        pretty: Indent by 2 spaces (for user-facing files); compact otherwise
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    """Write payload in one buffered write, then swap it into place.
+
+    Readers see either the old file or the new one, never a partial write.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb", buffering=64 * 1024) as f:
+        f.write(payload)
+        f.flush()
+    os.replace(tmp_path, path)
+
+
+def _loads(raw) -> dict:
+    """Parse UTF-8 JSON from a bytes-like object, using orjson when available.
+
+    Both parsers raise json.JSONDecodeError (orjson's error subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(str(raw, "utf-8"))
+
+
+# Quiet period before modified profiles are written; each edit restarts it
+SAVE_DELAY = 0.25
+
+# Files at least this large are memory-mapped instead of read into a copy
+MMAP_THRESHOLD = 64 * 1024
+
+
+def _load_file(path: Path) -> Tuple[dict, bytes]:
+    """Parse a JSON file.
+
+    Returns:
+        Tuple of (parsed data, blake2b digest of the file contents)
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            raw = f.read()
+            return _loads(raw), hashlib.blake2b(raw).digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):  # POSIX only
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # The view must be released before the mapping closes
+            with memoryview(mm) as view:
+                return _loads(view), hashlib.blake2b(view).digest()
+
+
+def _now_iso() -> str:
+    """Current time as an ISO 8601 UTC timestamp with second precision."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _monitor_signature(m: MonitorInfo) -> tuple:
+    """Settings that apply_monitor_settings() would change on a monitor."""
+    return (m.device_name, m.position_x, m.position_y, m.width, m.height,
+            m.refresh_rate, m.orientation, m.is_primary)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Profile:
     """A saved monitor configuration profile."""
     name: str
     monitors: List[MonitorInfo]
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=_now_iso)
+    updated_at: str = field(default_factory=_now_iso)
+    # Cache for enabled_positions; reset by set_monitors()
+    _enabled_positions: Optional[FrozenSet[Tuple[int, int]]] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    @property
+    def enabled_positions(self) -> FrozenSet[Tuple[int, int]]:
+        """Positions of the monitors this profile enables."""
+        if self._enabled_positions is None:
+            self._enabled_positions = frozenset(
+                (m.position_x, m.position_y) for m in self.monitors if m.enabled)
+        return self._enabled_positions
+
+    def set_monitors(self, monitors: List[MonitorInfo]) -> None:
+        """Replace the monitor list and drop derived caches."""
+        self.monitors = monitors
+        self._enabled_positions = None
 
     def to_dict(self) -> dict:
         return {
             "name": self.name,
-            "monitors": [m.to_dict() for m in self.monitors],
+            "monitors": list(map(MonitorInfo.to_dict, self.monitors)),
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Profile":
+    def from_dict(cls, data: dict, now: Optional[str] = None) -> "Profile":
+        """Build a profile from its dict form.
+
+        Args:
+            data: Dict from to_dict()
+            now: Timestamp for missing created_at/updated_at; lets batch
+                callers share one string. Defaults to the current time.
+        """
+        created_at = data.get("created_at")
+        updated_at = data.get("updated_at")
+        if created_at is None or updated_at is None:
+            now = now or _now_iso()
         return cls(
             name=data["name"],
-            monitors=[MonitorInfo.from_dict(m) for m in data["monitors"]],
-            created_at=data.get("created_at", datetime.now().isoformat()),
-            updated_at=data.get("updated_at", datetime.now().isoformat()),
+            monitors=list(map(MonitorInfo.from_dict, data["monitors"])),
+            created_at=created_at or now,
+            updated_at=updated_at or now,
         )
 
 
@@ -53,31 +173,97 @@ class ProfileManager:
     """Manages monitor configuration profiles."""
 
     def __init__(self):
-        self.profiles: Dict[str, Profile] = {}
+        # Every profile name in display order. Values stay None until the
+        # profile is first needed; until then its JSON dict is kept in
+        # _raw_profiles, so startup only has to read names.
+        self.profiles: Dict[str, Optional[Profile]] = {}
+        self._raw_profiles: Dict[str, dict] = {}
+        # Profile name -> position in self.profiles; None until first needed
+        self._name_to_idx: Optional[Dict[str, int]] = None
+        # Set by mutating methods; save_profiles() is a no-op while clear
+        self._dirty = False
+        # Mutations run on the UI thread while saves run on a timer thread
+        self._lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        # Digest of the bytes last read from or written to the profiles file
+        self._last_hash: Optional[bytes] = None
         self.load_profiles()
+        # The save timer is a daemon thread, so a pending save would be lost
+        # on any exit path that doesn't call flush() itself
+        atexit.register(self.flush)
 
     def load_profiles(self) -> None:
         """Load profiles from disk."""
+        self._name_to_idx = None
         path = get_profiles_path()
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.profiles = {
-                        name: Profile.from_dict(p)
-                        for name, p in data.get("profiles", {}).items()
-                    }
-            except (json.JSONDecodeError, KeyError):
+                data, self._last_hash = _load_file(path)
+                self._raw_profiles = dict(data.get("profiles", {}))
+                self.profiles = dict.fromkeys(self._raw_profiles)
+            except (json.JSONDecodeError, AttributeError):
                 self.profiles = {}
+                self._raw_profiles = {}
+
+    def _materialize(self, name: str) -> Optional[Profile]:
+        """Build a lazily loaded profile on first access and cache it."""
+        with self._lock:
+            profile = self.profiles.get(name)
+            if profile is None and name in self._raw_profiles:
+                try:
+                    profile = Profile.from_dict(self._raw_profiles[name])
+                except KeyError:
+                    return None  # Malformed entry; left as-is on disk
+                del self._raw_profiles[name]
+                self.profiles[name] = profile
+            return profile
+
+    def _profiles_data(self) -> dict:
+        """Serializable profiles; unloaded profiles reuse their raw dicts."""
+        return {
+            "profiles": {
+                name: p.to_dict() if p is not None else self._raw_profiles[name]
+                for name, p in self.profiles.items()
+            }
+        }
 
     def save_profiles(self) -> None:
-        """Save profiles to disk."""
-        path = get_profiles_path()
-        data = {
-            "profiles": {name: p.to_dict() for name, p in self.profiles.items()}
-        }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Save profiles to disk.
+
+        Skipped when nothing was modified since the last save, or when the
+        serialized profiles match what is already on disk.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = _dumps(self._profiles_data())
+            digest = hashlib.blake2b(payload).digest()
+            if digest != self._last_hash:
+                _atomic_write(get_profiles_path(), payload)
+                self._last_hash = digest
+            self._dirty = False
+
+    def _schedule_save(self) -> None:
+        """Mark profiles modified and save them once edits go quiet.
+
+        Each call restarts the SAVE_DELAY timer, so a burst of edits (e.g.
+        repeated move clicks) is written once. Use flush() to save now.
+        """
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self) -> None:
+        """Write any pending profile changes immediately."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self.save_profiles()
 
     def get_profile_names(self) -> List[str]:
         """Get list of profile names."""
@@ -85,7 +271,7 @@ class ProfileManager:
 
     def get_profile(self, name: str) -> Optional[Profile]:
         """Get a profile by name."""
-        return self.profiles.get(name)
+        return self._materialize(name)
 
     def save_current_as(self, name: str) -> Profile:
         """Save current monitor configuration as a profile (all enabled)."""
@@ -94,28 +280,36 @@ class ProfileManager:
 
     def save_current_as_with_states(self, name: str, monitors: List[MonitorInfo]) -> Profile:
         """Save monitor configuration with custom enabled states."""
-        now = datetime.now().isoformat()
-
-        if name in self.profiles:
-            # Update existing
-            profile = self.profiles[name]
-            profile.monitors = monitors
-            profile.updated_at = now
-        else:
-            # Create new
-            profile = Profile(name=name, monitors=monitors, created_at=now, updated_at=now)
-            self.profiles[name] = profile
+        with self._lock:
+            now = _now_iso()
+
+            if name in self.profiles:
+                # Update existing (replaced wholesale if it never loaded)
+                profile = self._materialize(name) or Profile(name=name, monitors=monitors, created_at=now)
+                self._raw_profiles.pop(name, None)
+                self.profiles[name] = profile
+                profile.set_monitors(monitors)
+                profile.updated_at = now
+            else:
+                # Create new
+                profile = Profile(name=name, monitors=monitors, created_at=now, updated_at=now)
+                self.profiles[name] = profile
+                if self._name_to_idx is not None:
+                    self._name_to_idx[name] = len(self.profiles) - 1
 
-        self.save_profiles()
-        return profile
+            self._schedule_save()
+            return profile
 
     def delete_profile(self, name: str) -> bool:
         """Delete a profile."""
-        if name in self.profiles:
-            del self.profiles[name]
-            self.save_profiles()
-            return True
-        return False
+        with self._lock:
+            if name in self.profiles:
+                del self.profiles[name]
+                self._raw_profiles.pop(name, None)
+                self._name_to_idx = None  # Later positions shift
+                self._schedule_save()
+                return True
+            return False
 
     def apply_profile(self, name: str, disable_extra: bool = False,
                        manage_windows: bool = True) -> ApplyResult:
@@ -126,60 +320,67 @@ class ProfileManager:
             disable_extra: If True, disable monitors not in the profile
             manage_windows: If True, save/restore window positions automatically
         """
-        profile = self.profiles.get(name)
+        profile = self._materialize(name)
         if not profile:
             return ApplyResult(success=False, failed=["Profile not found"])
 
         # Get current monitors before applying
         current_monitors = get_monitors()
-        current_monitor_positions = {(m.position_x, m.position_y) for m in current_monitors}
 
-        # Get monitors that will be enabled in the new profile
-        profile_monitor_positions = {
-            (m.position_x, m.position_y) for m in profile.monitors if m.enabled
-        }
+        # Nothing to do if the active layout already matches the profile
+        if frozenset(map(_monitor_signature, current_monitors)) == frozenset(
+                _monitor_signature(m) for m in profile.monitors if m.enabled):
+            return ApplyResult(success=True)
 
-        # Determine which monitors will be disabled
-        monitors_to_disable = current_monitor_positions - profile_monitor_positions
+        if manage_windows:
+            current_monitor_positions = frozenset(
+                (m.position_x, m.position_y) for m in current_monitors)
 
-        if manage_windows and monitors_to_disable:
-            # Only save positions when REDUCING monitors (not when expanding)
-            # This preserves the original multi-monitor layout for restoration
-            try:
-                # 1. Save current window positions (for restoration when expanding later)
-                saved_positions = window_manager.get_window_positions()
-                window_manager.save_positions_cache(saved_positions)
+            # Get monitors that will be enabled in the new profile
+            profile_monitor_positions = profile.enabled_positions
 
-                # 2. Move windows from all disabled monitors in a single pass
-                window_manager.move_windows_from_monitors(monitors_to_disable)
-            except Exception:
-                pass  # Don't fail profile application if window management fails
+            # Determine which monitors will be disabled
+            monitors_to_disable = current_monitor_positions - profile_monitor_positions
+
+            if monitors_to_disable:
+                # Only save positions when REDUCING monitors (not when expanding)
+                # This preserves the original multi-monitor layout for restoration
+                try:
+                    # 1. Save current window positions (for restoration when expanding later)
+                    saved_positions = window_manager.get_window_positions()
+                    window_manager.save_positions_cache(saved_positions)
+
+                    # 2. Move windows from all disabled monitors in a single pass
+                    window_manager.move_windows_from_monitors(monitors_to_disable)
+                except Exception:
+                    pass  # Don't fail profile application if window management fails
 
         # 3. Apply monitor settings
         result = apply_monitor_settings(profile.monitors, disable_extra=disable_extra)
+        # The layout window_manager cached before the change is now stale
+        window_manager.invalidate_monitor_cache()
 
         if manage_windows and result.success:
             try:
-                # 4. Check if we enabled any new monitors and restore windows
-                new_monitors = get_monitors()
-                new_monitor_positions = {(m.position_x, m.position_y) for m in new_monitors}
+                # 4. Check if we enabled any new monitors and restore windows.
+                # When every profile monitor was applied, the enabled layout is
+                # exactly the profile's, so there is no need to query it again.
+                if result.skipped:
+                    new_monitor_positions = frozenset(
+                        (m.position_x, m.position_y) for m in get_monitors())
+                else:
+                    new_monitor_positions = profile_monitor_positions
 
                 # Monitors that were just enabled
                 newly_enabled = new_monitor_positions - current_monitor_positions
 
                 if newly_enabled:
-                    # Load cached positions and restore windows that belong to newly enabled monitors
+                    # Restore cached windows that belong to newly enabled monitors.
+                    # Minimized windows are skipped (they're in the taskbar,
+                    # no position to restore).
                     cached = window_manager.load_positions_cache()
-                    # Pre-fetch available monitors and window lookup map once for all restorations
-                    available_monitors = window_manager.get_available_monitor_positions()
-                    wl = window_manager.build_window_lookup()
-                    for pos in cached:
-                        # Skip minimized windows (they're in the taskbar, no position to restore)
-                        if pos.state == window_manager.SW_SHOWMINIMIZED:
-                            continue
-                        if (pos.monitor_x, pos.monitor_y) in newly_enabled:
-                            window_manager.restore_window_position(
-                                pos, available_monitors=available_monitors, window_lookup=wl)
+                    window_manager.restore_window_positions(
+                        [pos for pos in cached if (pos.monitor_x, pos.monitor_y) in newly_enabled])
             except Exception:
                 pass  # Don't fail if window restoration fails
 
@@ -187,57 +388,80 @@ class ProfileManager:
 
     def rename_profile(self, old_name: str, new_name: str) -> bool:
         """Rename a profile."""
-        if old_name not in self.profiles or new_name in self.profiles:
-            return False
-
-        # Preserve order
-        new_profiles = {}
-        for name, p in self.profiles.items():
-            if name == old_name:
-                p.name = new_name
-                p.updated_at = datetime.now().isoformat()
-                new_profiles[new_name] = p
-            else:
-                new_profiles[name] = p
-        self.profiles = new_profiles
-        self.save_profiles()
-        return True
+        with self._lock:
+            if old_name not in self.profiles or new_name in self.profiles:
+                return False
+            if self._materialize(old_name) is None:
+                return False
+
+            # Preserve order: re-key in place, then rotate the keys that
+            # followed it back behind the new name
+            following = list(itertools.dropwhile(lambda n: n != old_name, self.profiles))[1:]
+            profile = self.profiles.pop(old_name)
+            profile.name = new_name
+            profile.updated_at = _now_iso()
+            self.profiles[new_name] = profile
+            self._move_to_end(following)
+            if self._name_to_idx is not None:
+                self._name_to_idx[new_name] = self._name_to_idx.pop(old_name)
+            self._schedule_save()
+            return True
 
     def move_profile(self, from_idx: int, to_idx: int) -> bool:
         """Move a profile from one position to another."""
-        names = list(self.profiles.keys())
-        if from_idx < 0 or from_idx >= len(names) or to_idx < 0 or to_idx >= len(names):
-            return False
-
-        # Swap positions
-        names[from_idx], names[to_idx] = names[to_idx], names[from_idx]
+        with self._lock:
+            count = len(self.profiles)
+            if from_idx < 0 or from_idx >= count or to_idx < 0 or to_idx >= count:
+                return False
+
+            # Swap positions. Only keys from the first swapped slot onward move;
+            # everything before it keeps its place in the dict.
+            lo, hi = sorted((from_idx, to_idx))
+            tail = list(itertools.islice(self.profiles, lo, None))
+            tail[0], tail[hi - lo] = tail[hi - lo], tail[0]
+            self._move_to_end(tail)
+            if self._name_to_idx is not None:
+                self._name_to_idx[tail[0]] = lo
+                self._name_to_idx[tail[hi - lo]] = hi
+            self._schedule_save()
+            return True
 
-        # Rebuild dict in new order
-        new_profiles = {name: self.profiles[name] for name in names}
-        self.profiles = new_profiles
-        self.save_profiles()
-        return True
+    def move_profile_by_name(self, name: str, delta: int) -> bool:
+        """Move a profile by delta positions (negative moves it up)."""
+        with self._lock:
+            if self._name_to_idx is None:
+                self._name_to_idx = {n: i for i, n in enumerate(self.profiles)}
+            idx = self._name_to_idx.get(name)
+            if idx is None:
+                return False
+            return self.move_profile(idx, idx + delta)
+
+    def _move_to_end(self, names: List[str]) -> None:
+        """Re-insert names at the end of the profile order, in the given order."""
+        for name in names:
+            self.profiles[name] = self.profiles.pop(name)
 
     def export_profiles(self, file_path: str) -> bool:
         """Export all profiles to a JSON file."""
         try:
-            data = {
-                "profiles": {name: p.to_dict() for name, p in self.profiles.items()}
-            }
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                payload = _dumps(self._profiles_data(), pretty=True)
+            _atomic_write(Path(file_path), payload)
             return True
         except Exception:
             return False
 
     def import_profiles(self, file_path: str) -> bool:
         """Import profiles from a JSON file (merges with existing)."""
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        with self._lock:
+            try:
+                data, _ = _load_file(Path(file_path))
+                now = _now_iso()  # One timestamp for the whole batch
                 for name, p in data.get("profiles", {}).items():
-                    self.profiles[name] = Profile.from_dict(p)
-            self.save_profiles()
-            return True
-        except Exception:
-            return False
+                    self.profiles[name] = Profile.from_dict(p, now)
+                    self._raw_profiles.pop(name, None)
+                self._name_to_idx = None
+                self._schedule_save()
+                return True
+            except Exception:
+                return False
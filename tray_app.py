@@ -2,40 +2,52 @@
 import os
 import sys
 import threading
+import time
 from tkinter import filedialog
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict, Tuple
 
 import pystray
 from PIL import Image, ImageDraw
 import customtkinter as ctk
 
-from monitor_api import get_monitors, MonitorInfo
-from profile_manager import ProfileManager
+from monitor_api import get_monitors, MonitorInfo, start_display_change_listener
+from profile_manager import ProfileManager, get_config_dir
 
 # Set appearance
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
-# Fix customtkinter threading bug (RuntimeError: dictionary changed size during iteration)
-# Patch the ScalingTracker to handle concurrent modifications safely
-try:
-    from customtkinter.windows.widgets.scaling import ScalingTracker
-    _original_check_dpi = ScalingTracker.check_dpi_scaling.__func__
+# Bump when the icon drawing changes so stale disk caches are ignored
+ICON_CACHE_VERSION = 1
+_icon_cache: Dict[int, Image.Image] = {}
 
-    @classmethod
-    def _safe_check_dpi_scaling(cls, *args, **kwargs):
-        try:
-            return _original_check_dpi(cls, *args, **kwargs)
-        except RuntimeError:
-            pass  # Ignore "dictionary changed size during iteration"
 
-    ScalingTracker.check_dpi_scaling = _safe_check_dpi_scaling
-except Exception:
-    pass
+def create_icon_image(size=64):
+    """Create a simple monitor icon with white outline for system tray.
+
+    The rendered pixels are cached in memory and as raw RGBA on disk, so
+    the drawing code only runs once per icon size.
+    """
+    image = _icon_cache.get(size)
+    if image is None:
+        cache_path = get_config_dir() / f"icon_cache_v{ICON_CACHE_VERSION}_{size}.rgba"
+        try:
+            data = cache_path.read_bytes()
+            if len(data) != size * size * 4:
+                raise ValueError("stale icon cache")
+            image = Image.frombytes("RGBA", (size, size), data)
+        except (OSError, ValueError):
+            image = _draw_icon_image(size)
+            try:
+                cache_path.write_bytes(image.tobytes())
+            except OSError:
+                pass  # Cache is optional
+        _icon_cache[size] = image
+    return image.copy()
 
 
-def create_icon_image(size=64):
-    """Create a simple monitor icon with white outline for system tray."""
+def _draw_icon_image(size: int) -> Image.Image:
+    """Draw the tray icon."""
     image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(image)
 
@@ -77,15 +89,18 @@ def create_icon_image(size=64):
 class SettingsWindow:
     """Settings window for profile management."""
 
-    def __init__(self, profile_manager: ProfileManager, on_close=None):
+    def __init__(self, profile_manager: ProfileManager, master: ctk.CTk, on_close=None):
         self.profile_manager = profile_manager
+        self.master = master
         self.on_close = on_close
-        self.window: Optional[ctk.CTk] = None
+        self.window: Optional[ctk.CTkToplevel] = None
         self.monitor_vars: Dict[str, ctk.BooleanVar] = {}
+        # device_name -> (row frame, label); rows are reused across refreshes
+        self.monitor_rows: Dict[str, Tuple[ctk.CTkFrame, ctk.CTkLabel]] = {}
         self.disable_extra_var: Optional[ctk.BooleanVar] = None
 
     def show(self):
-        """Show the settings window."""
+        """Show the settings window. Must be called on the Tk thread."""
         if self.window is not None:
             try:
                 self.window.lift()
@@ -94,14 +109,15 @@ class SettingsWindow:
             except:
                 self.window = None
 
-        self.window = ctk.CTk()
+        self.window = ctk.CTkToplevel(self.master)
         self.window.title("DisplaySnap")
         self.window.geometry("620x600")
         self.window.minsize(500, 500)
         self.window.resizable(True, True)
         self.window.attributes('-topmost', True)  # Always on top
 
-        # Set window icon (for taskbar) - delayed to ensure window is ready
+        # Set window icon (for taskbar) - delayed until after CTkToplevel
+        # applies its default icon (200 ms after creation)
         def set_icon():
             try:
                 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -111,7 +127,7 @@ class SettingsWindow:
                     self.window.iconbitmap(ico_path)
             except Exception:
                 pass
-        self.window.after(100, set_icon)
+        self.window.after(250, set_icon)
 
         # Main frame
         main_frame = ctk.CTkFrame(self.window)
@@ -167,7 +183,7 @@ class SettingsWindow:
 
         self.profile_listbox = ctk.CTkScrollableFrame(list_frame, height=100)
         self.profile_listbox.pack(fill="both", expand=True, padx=5, pady=5)
-        self.profile_buttons: List[ctk.CTkButton] = []
+        self.profile_button_by_name: Dict[str, ctk.CTkButton] = {}
 
         ctk.CTkButton(btn_frame, text="Save", command=self._save_profile, width=55).pack(side="left", padx=2)
         ctk.CTkButton(btn_frame, text="Apply", command=self._apply_selected, width=55).pack(side="left", padx=2)
@@ -184,62 +200,93 @@ class SettingsWindow:
         self._refresh()
 
         self.window.protocol("WM_DELETE_WINDOW", self._on_close)
-        try:
-            self.window.mainloop()
-        except Exception as e:
-            print(f"Settings window error: {e}")
-            self._on_close()
 
     def _refresh(self):
-        """Refresh the display."""
-        # Clear and rebuild monitor checkboxes
-        for widget in self.monitors_frame.winfo_children():
-            widget.destroy()
-        self.monitor_vars.clear()
+        """Refresh the display.
 
+        Widgets are updated in place; only rows for added or removed monitors
+        and profiles are created or destroyed.
+        """
         monitors = get_monitors()
+        device_names = [m.device_name for m in monitors]
+        for name in set(self.monitor_rows) - set(device_names):
+            self.monitor_rows.pop(name)[0].destroy()
+            del self.monitor_vars[name]
+
         for m in monitors:
-            var = ctk.BooleanVar(value=True)
-            self.monitor_vars[m.device_name] = var
+            primary = " [Primary]" if m.is_primary else ""
+            text = f"{m.device_name}{primary}: {m.width}x{m.height} @ {m.refresh_rate}Hz"
 
-            frame = ctk.CTkFrame(self.monitors_frame, fg_color="transparent")
-            frame.pack(fill="x", pady=2, padx=5)
+            row = self.monitor_rows.get(m.device_name)
+            if row is None:
+                var = ctk.BooleanVar(value=True)
+                self.monitor_vars[m.device_name] = var
 
-            cb = ctk.CTkCheckBox(frame, text="", variable=var, width=20)
-            cb.pack(side="left")
+                frame = ctk.CTkFrame(self.monitors_frame, fg_color="transparent")
+                frame.pack(fill="x", pady=2, padx=5)
 
-            primary = " [Primary]" if m.is_primary else ""
-            text = f"{m.device_name}{primary}: {m.width}x{m.height} @ {m.refresh_rate}Hz"
-            label = ctk.CTkLabel(frame, text=text, anchor="w")
-            label.pack(side="left", padx=5)
+                cb = ctk.CTkCheckBox(frame, text="", variable=var, width=20)
+                cb.pack(side="left")
+
+                label = ctk.CTkLabel(frame, text=text, anchor="w")
+                label.pack(side="left", padx=5)
+                self.monitor_rows[m.device_name] = (frame, label)
+            else:
+                self.monitor_vars[m.device_name].set(True)
+                if row[1].cget("text") != text:
+                    row[1].configure(text=text)
+
+        if list(self.monitor_rows) != device_names:
+            self.monitor_rows = {name: self.monitor_rows[name] for name in device_names}
+            self._repack([row[0] for row in self.monitor_rows.values()], fill="x", pady=2, padx=5)
 
         # Update profile list
-        for btn in self.profile_buttons:
-            btn.destroy()
-        self.profile_buttons.clear()
-
-        for name in self.profile_manager.get_profile_names():
-            btn = ctk.CTkButton(
-                self.profile_listbox,
-                text=name,
-                anchor="w",
-                fg_color="transparent" if name != self.selected_profile else None,
-                command=lambda n=name: self._select_profile(n)
-            )
-            btn.pack(fill="x", pady=2)
-            btn.bind("<Double-Button-1>", lambda e, n=name: self._apply_profile(n))
-            self.profile_buttons.append(btn)
+        profile_names = self.profile_manager.get_profile_names()
+        for name in set(self.profile_button_by_name) - set(profile_names):
+            self.profile_button_by_name.pop(name).destroy()
+
+        for name in profile_names:
+            fg_color = self._profile_fg_color(name)
+            btn = self.profile_button_by_name.get(name)
+            if btn is None:
+                btn = ctk.CTkButton(
+                    self.profile_listbox,
+                    text=name,
+                    anchor="w",
+                    fg_color=fg_color,
+                    command=lambda n=name: self._select_profile(n)
+                )
+                btn.pack(fill="x", pady=2)
+                btn.bind("<Double-Button-1>", lambda e, n=name: self._apply_profile(n))
+                self.profile_button_by_name[name] = btn
+            elif btn.cget("fg_color") != fg_color:
+                btn.configure(fg_color=fg_color)
+
+        if list(self.profile_button_by_name) != profile_names:
+            self.profile_button_by_name = {name: self.profile_button_by_name[name] for name in profile_names}
+            self._repack(list(self.profile_button_by_name.values()), fill="x", pady=2)
+
+    @staticmethod
+    def _repack(widgets: List, **pack_options) -> None:
+        """Re-pack existing widgets in list order, without recreating them."""
+        for widget in widgets:
+            widget.pack_forget()
+        for widget in widgets:
+            widget.pack(**pack_options)
+
+    def _profile_fg_color(self, name: str):
+        """Button color for a profile row (highlighted when selected)."""
+        if name == self.selected_profile:
+            return ctk.ThemeManager.theme["CTkButton"]["fg_color"]
+        return "transparent"
 
     def _select_profile(self, name: str):
         """Select a profile."""
         self.selected_profile = name
 
         # Update button styles
-        for btn in self.profile_buttons:
-            if btn.cget("text") == name:
-                btn.configure(fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"])
-            else:
-                btn.configure(fg_color="transparent")
+        for btn_name, btn in self.profile_button_by_name.items():
+            btn.configure(fg_color=self._profile_fg_color(btn_name))
 
         # Show detail
         profile = self.profile_manager.get_profile(name)
@@ -305,27 +352,15 @@ class SettingsWindow:
         """Move selected profile up."""
         if not self.selected_profile:
             return
-        names = self.profile_manager.get_profile_names()
-        try:
-            idx = names.index(self.selected_profile)
-            if idx > 0:
-                self.profile_manager.move_profile(idx, idx - 1)
-                self._refresh()
-        except ValueError:
-            pass
+        if self.profile_manager.move_profile_by_name(self.selected_profile, -1):
+            self._refresh()
 
     def _move_down(self):
         """Move selected profile down."""
         if not self.selected_profile:
             return
-        names = self.profile_manager.get_profile_names()
-        try:
-            idx = names.index(self.selected_profile)
-            if idx < len(names) - 1:
-                self.profile_manager.move_profile(idx, idx + 1)
-                self._refresh()
-        except ValueError:
-            pass
+        if self.profile_manager.move_profile_by_name(self.selected_profile, 1):
+            self._refresh()
 
     def _delete_profile(self):
         """Delete selected profile."""
@@ -341,7 +376,8 @@ class SettingsWindow:
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-            title="Export Profiles"
+            title="Export Profiles",
+            parent=self.window
         )
         if file_path:
             if self.profile_manager.export_profiles(file_path):
@@ -351,7 +387,8 @@ class SettingsWindow:
         """Import profiles from a JSON file."""
         file_path = filedialog.askopenfilename(
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-            title="Import Profiles"
+            title="Import Profiles",
+            parent=self.window
         )
         if file_path:
             if self.profile_manager.import_profiles(file_path):
@@ -373,6 +410,21 @@ class TrayApp:
         self.profile_manager = ProfileManager()
         self.settings_window: Optional[SettingsWindow] = None
         self.icon: Optional[pystray.Icon] = None
+        # Hidden Tk root owned by the main thread; all UI work runs on it
+        self.root: Optional[ctk.CTk] = None
+        # Menu callbacks per profile name, reused across menu rebuilds
+        self._apply_callbacks: Dict[str, Callable] = {}
+
+    def _get_apply_callbacks(self, profile_names: List[str]) -> Dict[str, Callable]:
+        """Get apply callbacks for the profile names, rebuilt only when names change."""
+        if self._apply_callbacks.keys() != set(profile_names):
+            # pystray inspects the callback's argument count, so this has to be
+            # a plain function rather than a functools.partial
+            self._apply_callbacks = {
+                name: self._apply_callbacks.get(name) or (lambda _, n=name: self._apply_profile(n))
+                for name in profile_names
+            }
+        return self._apply_callbacks
 
     def _build_menu(self):
         """Build the tray menu."""
@@ -383,10 +435,8 @@ class TrayApp:
 
         profile_names = self.profile_manager.get_profile_names()
         if profile_names:
-            profile_items = [
-                pystray.MenuItem(name, lambda _, n=name: self._apply_profile(n))
-                for name in profile_names
-            ]
+            callbacks = self._get_apply_callbacks(profile_names)
+            profile_items = [pystray.MenuItem(name, callbacks[name]) for name in profile_names]
             items.append(pystray.MenuItem("Apply Profile", pystray.Menu(*profile_items)))
         else:
             items.append(pystray.MenuItem("No saved profiles", None, enabled=False))
@@ -398,25 +448,32 @@ class TrayApp:
 
         return pystray.Menu(*items)
 
+    def _call_in_ui(self, func, *args):
+        """Schedule func on the Tk thread (safe to call from any thread)."""
+        if self.root is not None:
+            self.root.after(0, func, *args)
+
     def _show_settings(self):
         """Show the settings window."""
+        self._call_in_ui(self._open_settings)
+
+    def _open_settings(self):
+        """Open or focus the settings window (Tk thread)."""
         # Check if window already exists and is open
         if self.settings_window and self.settings_window.window:
             try:
                 self.settings_window.window.lift()
                 self.settings_window.window.focus_force()
                 return
-            except:
+            except Exception:
                 pass  # Window was destroyed, create new one
 
-        def run_settings():
-            self.settings_window = SettingsWindow(
-                self.profile_manager,
-                on_close=lambda: self._update_menu()
-            )
-            self.settings_window.show()
-
-        threading.Thread(target=run_settings, daemon=True).start()
+        self.settings_window = SettingsWindow(
+            self.profile_manager,
+            self.root,
+            on_close=self._update_menu
+        )
+        self.settings_window.show()
 
     def _apply_profile(self, name: str):
         """Apply a profile from the tray menu (runs in background thread)."""
@@ -436,24 +493,22 @@ class TrayApp:
 
     def _quick_save(self):
         """Quick save current configuration."""
-        def save():
-            try:
-                app = ctk.CTk()
-                app.withdraw()
-                dialog = ctk.CTkInputDialog(text="Enter profile name:", title="Save Profile")
-                name = dialog.get_input()
-                app.destroy()
+        self._call_in_ui(self._quick_save_dialog)
 
-                if name:
-                    name = name.strip()
-                    if name:
-                        self.profile_manager.save_current_as(name)
-                        self._update_menu()
-                        self.icon.notify(f"Saved: {name}", "DisplaySnap")
-            except Exception as e:
-                print(f"Quick save error: {e}")
+    def _quick_save_dialog(self):
+        """Ask for a profile name and save the current configuration (Tk thread)."""
+        try:
+            dialog = ctk.CTkInputDialog(text="Enter profile name:", title="Save Profile")
+            name = dialog.get_input()
 
-        threading.Thread(target=save, daemon=True).start()
+            if name:
+                name = name.strip()
+                if name:
+                    self.profile_manager.save_current_as(name)
+                    self._update_menu()
+                    self.icon.notify(f"Saved: {name}", "DisplaySnap")
+        except Exception as e:
+            print(f"Quick save error: {e}")
 
     def _update_menu(self):
         """Update the tray menu."""
@@ -462,11 +517,14 @@ class TrayApp:
 
     def _exit(self):
         """Exit the application."""
+        # Profile saves are debounced; write anything still pending
+        self.profile_manager.flush()
         if self.icon:
             self.icon.stop()
+        self._call_in_ui(self.root.quit)
 
-    def run(self):
-        """Run the tray application."""
+    def _run_icon(self):
+        """Run the tray icon until exit (tray thread)."""
         while True:
             try:
                 image = create_icon_image()
@@ -477,22 +535,35 @@ class TrayApp:
                     menu=self._build_menu()
                 )
 
-                # Open settings window after a short delay (gives tray icon time to initialize)
-                def delayed_open_settings():
-                    import time
-                    time.sleep(0.5)  # Small delay to ensure tray icon is ready
-                    self._show_settings()
-
-                threading.Thread(target=delayed_open_settings, daemon=True).start()
-
-                # Run the icon (blocking call - keeps app alive)
+                # Run the icon (blocking call)
                 self.icon.run()
                 break
             except Exception as e:
                 print(f"Tray app error: {e}, restarting...")
-                import time
                 time.sleep(1)
 
+        # Tray icon is gone; end the UI loop as well
+        self._call_in_ui(self.root.quit)
+
+    def run(self):
+        """Run the tray application."""
+        # Keep display caches valid until Windows reports a display change
+        start_display_change_listener()
+
+        # Tk is not thread-safe, so one hidden root lives on this thread and
+        # every window is a child of it. pystray runs in its own thread.
+        self.root = ctk.CTk()
+        self.root.withdraw()
+
+        threading.Thread(target=self._run_icon, daemon=True).start()
+
+        # Open settings window after a short delay (gives tray icon time to initialize)
+        self.root.after(500, self._open_settings)
+
+        # Keeps app alive until Exit
+        self.root.mainloop()
+        self.root.destroy()
+
 
 def main():
     try:
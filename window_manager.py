@@ -1,10 +1,18 @@
 """Window position management for DisplaySnap."""
 import ctypes
 from ctypes import wintypes
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Set, Tuple
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import (AbstractSet, Any, Callable, Dict, FrozenSet, List, NamedTuple,
+                    Optional, Set, Tuple)
+import hashlib
+import operator
 import os
+import pickle
+import struct
+import sys
+import threading
+import time
 from pathlib import Path
 
 # Windows API constants
@@ -64,6 +72,13 @@ class WINDOWPLACEMENT(ctypes.Structure):
     ]
 
 
+# Reads (showCmd, left, top, right, bottom) out of a WINDOWPLACEMENT in one
+# call, skipping ptMinPosition/ptMaxPosition; cheaper than five field getters
+_WP_STATE_OFFSET = WINDOWPLACEMENT.showCmd.offset
+_unpack_placement = struct.Struct("=I{}x4i".format(
+    WINDOWPLACEMENT.rcNormalPosition.offset - _WP_STATE_OFFSET - 4)).unpack_from
+
+
 class MONITORINFO(ctypes.Structure):
     _fields_ = [
         ("cbSize", wintypes.DWORD),
@@ -82,25 +97,143 @@ EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPAR
 MonitorEnumProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HANDLE, wintypes.HDC,
                                       ctypes.POINTER(RECT), wintypes.LPARAM)
 
+# Prototyped functions are private pointers taken by indexing the DLL (as in
+# monitor_api), so their argtypes can't clash with prototypes other modules
+# set on the shared windll handles.
+# Enumeration prototypes: callbacks are passed as the declared types, so
+# ctypes does not have to work out the conversion on every call
+_EnumWindows = user32["EnumWindows"]
+_EnumWindows.argtypes = [EnumWindowsProc, wintypes.LPARAM]
+_EnumWindows.restype = wintypes.BOOL
+_EnumDisplayMonitors = user32["EnumDisplayMonitors"]
+_EnumDisplayMonitors.argtypes = [wintypes.HDC, ctypes.POINTER(RECT), MonitorEnumProc, wintypes.LPARAM]
+_EnumDisplayMonitors.restype = wintypes.BOOL
+
+
+# Static callback trampolines: building a WINFUNCTYPE thunk allocates an
+# executable closure, so each enumeration instead passes its Python callback
+# through lParam (as a py_object address) to one of these shared thunks.
+def _enum_windows_trampoline(hwnd, lparam):
+    return ctypes.cast(lparam, ctypes.py_object).value(hwnd)
+
+
+def _enum_monitors_trampoline(hmonitor, hdc, lprect, lparam):
+    return ctypes.cast(lparam, ctypes.py_object).value(hmonitor)
+
+
+_ENUM_WINDOWS_TRAMPOLINE = EnumWindowsProc(_enum_windows_trampoline)
+_ENUM_MONITORS_TRAMPOLINE = MonitorEnumProc(_enum_monitors_trampoline)
+
+
+def _enum_windows(callback: Callable[[int], bool]) -> None:
+    """EnumWindows with callback(hwnd) -> continue; the caller keeps it alive."""
+    _EnumWindows(_ENUM_WINDOWS_TRAMPOLINE, id(callback))
+
+
+def _enum_monitors(callback: Callable[[int], bool]) -> None:
+    """EnumDisplayMonitors over all monitors with callback(hmonitor) -> continue."""
+    _EnumDisplayMonitors(None, None, _ENUM_MONITORS_TRAMPOLINE, id(callback))
+
 # Set up QueryFullProcessImageNameW prototype once
-kernel32.QueryFullProcessImageNameW.argtypes = [
+_QueryFullProcessImageNameW = kernel32["QueryFullProcessImageNameW"]
+_QueryFullProcessImageNameW.argtypes = [
     wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)
 ]
-kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+_QueryFullProcessImageNameW.restype = wintypes.BOOL
+_OpenProcess = kernel32["OpenProcess"]
+_OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+_OpenProcess.restype = wintypes.HANDLE
+_CloseHandle = kernel32["CloseHandle"]
+_CloseHandle.argtypes = [wintypes.HANDLE]
+_CloseHandle.restype = wintypes.BOOL
+
+# Window and monitor query prototypes (fast argument conversion, and
+# handle-sized values are not truncated on 64-bit)
+_IsWindow = user32["IsWindow"]
+_IsWindow.argtypes = [wintypes.HWND]
+_IsWindow.restype = wintypes.BOOL
+_SetWindowPos = user32["SetWindowPos"]
+_SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+                          ctypes.c_int, ctypes.c_int, wintypes.UINT]
+_SetWindowPos.restype = wintypes.BOOL
+_IsHungAppWindow = user32["IsHungAppWindow"]
+_IsHungAppWindow.argtypes = [wintypes.HWND]
+_IsHungAppWindow.restype = wintypes.BOOL
+_IsWindowVisible = user32["IsWindowVisible"]
+_IsWindowVisible.argtypes = [wintypes.HWND]
+_IsWindowVisible.restype = wintypes.BOOL
+# GetWindowLongPtrW is only exported by 64-bit user32; 32-bit builds
+# use GetWindowLongW, which is pointer-sized there anyway
+if ctypes.sizeof(ctypes.c_void_p) == 8:
+    _GetWindowLongPtr = user32["GetWindowLongPtrW"]
+    _GetWindowLongPtr.restype = ctypes.c_ssize_t
+else:
+    _GetWindowLongPtr = user32["GetWindowLongW"]
+    _GetWindowLongPtr.restype = wintypes.LONG
+_GetWindowLongPtr.argtypes = [wintypes.HWND, ctypes.c_int]
+_GetWindowTextLengthW = user32["GetWindowTextLengthW"]
+_GetWindowTextLengthW.argtypes = [wintypes.HWND]
+_GetWindowTextLengthW.restype = ctypes.c_int
+_GetWindowTextW = user32["GetWindowTextW"]
+_GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+_GetWindowTextW.restype = ctypes.c_int
+_GetWindowThreadProcessId = user32["GetWindowThreadProcessId"]
+_GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+_GetWindowThreadProcessId.restype = wintypes.DWORD
+_GetWindowPlacement = user32["GetWindowPlacement"]
+_GetWindowPlacement.argtypes = [wintypes.HWND, ctypes.POINTER(WINDOWPLACEMENT)]
+_GetWindowPlacement.restype = wintypes.BOOL
+_SetWindowPlacement = user32["SetWindowPlacement"]
+_SetWindowPlacement.argtypes = [wintypes.HWND, ctypes.POINTER(WINDOWPLACEMENT)]
+_SetWindowPlacement.restype = wintypes.BOOL
+_MonitorFromWindow = user32["MonitorFromWindow"]
+_MonitorFromWindow.argtypes = [wintypes.HWND, wintypes.DWORD]
+_MonitorFromWindow.restype = wintypes.HMONITOR
+_MonitorFromPoint = user32["MonitorFromPoint"]
+_MonitorFromPoint.argtypes = [POINT, wintypes.DWORD]
+_MonitorFromPoint.restype = wintypes.HMONITOR
+_GetMonitorInfoW = user32["GetMonitorInfoW"]
+_GetMonitorInfoW.argtypes = [wintypes.HMONITOR, ctypes.POINTER(MONITORINFO)]
+_GetMonitorInfoW.restype = wintypes.BOOL
 
 # Reusable buffers for hot-path functions
 _process_buf = ctypes.create_unicode_buffer(260)
 _process_size = wintypes.DWORD(260)
+TITLE_BUF_LEN = 512
+_title_buf = ctypes.create_unicode_buffer(TITLE_BUF_LEN)
 _pid_dword = wintypes.DWORD()
 _wp_struct = WINDOWPLACEMENT()
 _wp_struct.length = ctypes.sizeof(_wp_struct)
-_mi_struct = MONITORINFO()
-_mi_struct.cbSize = ctypes.sizeof(_mi_struct)
+
+# Per-thread structures for code that also runs on the restore/move pool
+_thread_structs = threading.local()
+
+
+def _thread_placement() -> WINDOWPLACEMENT:
+    """Get this thread's reusable WINDOWPLACEMENT (filled by GetWindowPlacement)."""
+    wp = getattr(_thread_structs, "wp", None)
+    if wp is None:
+        wp = _thread_structs.wp = WINDOWPLACEMENT()
+        wp.length = ctypes.sizeof(wp)
+    return wp
 
 
-@dataclass
-class WindowPosition:
-    """Saved window position data."""
+def _thread_monitor_info() -> MONITORINFO:
+    """Get this thread's reusable MONITORINFO (filled by GetMonitorInfoW)."""
+    mi = getattr(_thread_structs, "mi", None)
+    if mi is None:
+        mi = _thread_structs.mi = MONITORINFO()
+        mi.cbSize = ctypes.sizeof(mi)
+    return mi
+
+
+class WindowPosition(NamedTuple):
+    """Saved window position data.
+
+    A NamedTuple: positions are never modified after capture, and tuples are
+    compact and quick to build on every Python version (unlike slotted
+    dataclasses, which need 3.10+).
+    """
     hwnd: int
     title: str
     process_name: str
@@ -112,35 +245,40 @@ class WindowPosition:
     monitor_x: int  # Monitor's left position (to identify which monitor)
     monitor_y: int  # Monitor's top position
 
+    def to_tuple(self) -> tuple:
+        """Field values in declaration order as a plain tuple (inverse of WindowPosition(*t))."""
+        return tuple(self)
+
     def to_dict(self) -> dict:
-        return {
-            "hwnd": self.hwnd,
-            "title": self.title,
-            "process_name": self.process_name,
-            "x": self.x,
-            "y": self.y,
-            "width": self.width,
-            "height": self.height,
-            "state": self.state,
-            "monitor_x": self.monitor_x,
-            "monitor_y": self.monitor_y,
-        }
+        return dict(zip(self._fields, self))
 
     @classmethod
     def from_dict(cls, data: dict) -> "WindowPosition":
-        return cls(**data)
+        return cls(*_window_items(data))
+
+
+_window_items = operator.itemgetter(*WindowPosition._fields)
 
 
+@lru_cache(maxsize=1)
 def get_cache_path() -> Path:
-    """Get the window positions cache file path."""
+    """Get the window positions cache file path.
+
+    The cache only bridges one profile switch to the next, so its format is
+    internal and may change between versions (unreadable files load as empty).
+    Resolved (and the directory created) once per process.
+    """
     appdata = os.environ.get("APPDATA", os.path.expanduser("~"))
     cache_dir = Path(appdata) / "DisplaySnap"
     cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir / "window_cache.json"
+    return cache_dir / "window_cache.pickle"
 
 
 # --- Process name cache (PID-based) ---
-_pid_cache: Dict[int, str] = {}
+# pid -> (monotonic time resolved, name). Entries live for PID_CACHE_TTL so
+# back-to-back sweeps share lookups; PIDs can be reused, so they do expire.
+_pid_cache: Dict[int, Tuple[float, str]] = {}
+PID_CACHE_TTL = 5.0
 
 SKIP_PROCESSES = frozenset([
     "TextInputHost.exe",
@@ -157,9 +295,14 @@ SKIP_TITLES = frozenset([
 ])
 
 
+def clear_pid_cache() -> None:
+    """Drop all cached process names."""
+    _pid_cache.clear()
+
+
 def _get_pid(hwnd: int) -> int:
     """Get process ID for a window handle."""
-    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(_pid_dword))
+    _GetWindowThreadProcessId(hwnd, ctypes.byref(_pid_dword))
     return _pid_dword.value
 
 
@@ -169,28 +312,33 @@ def _get_process_name_by_pid(pid: int) -> str:
     Uses QueryFullProcessImageNameW with PROCESS_QUERY_LIMITED_INFORMATION
     for lower permission requirements and fewer API calls.
     """
+    now = time.monotonic()
     cached = _pid_cache.get(pid)
-    if cached is not None:
-        return cached
+    if cached is not None and now - cached[0] < PID_CACHE_TTL:
+        return cached[1]
 
     name = ""
     try:
-        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        handle = _OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
         if handle:
             try:
                 _process_size.value = 260
-                if kernel32.QueryFullProcessImageNameW(
+                if _QueryFullProcessImageNameW(
                     handle, 0, _process_buf, ctypes.byref(_process_size)
                 ):
                     # Extract filename from full path: "C:\...\app.exe" -> "app.exe"
                     full_path = _process_buf.value
                     name = full_path.rsplit('\\', 1)[-1]
             finally:
-                kernel32.CloseHandle(handle)
+                _CloseHandle(handle)
     except Exception:
         pass
 
-    _pid_cache[pid] = name
+    if name:
+        _pid_cache[pid] = (now, name)
+    else:
+        # Query failed: don't keep a stale name for a possibly reused PID
+        _pid_cache.pop(pid, None)
     return name
 
 
@@ -200,51 +348,100 @@ def get_process_name(hwnd: int) -> str:
 
 
 def get_window_title(hwnd: int) -> str:
-    """Get the window title."""
+    """Get the window title.
+
+    Reads into a reusable buffer with a single GetWindowTextW call; only
+    titles that fill the buffer pay for the length probe and a full-size read.
+    """
     try:
-        length = user32.GetWindowTextLengthW(hwnd)
-        if length > 0:
-            buffer = ctypes.create_unicode_buffer(length + 1)
-            user32.GetWindowTextW(hwnd, buffer, length + 1)
-            return buffer.value
+        n = _GetWindowTextW(hwnd, _title_buf, TITLE_BUF_LEN)
+        if n < TITLE_BUF_LEN - 1:
+            # Slice by the returned length instead of scanning for the NUL
+            return _title_buf[:n] if n > 0 else ""
+        # Possibly truncated: fall back to an exactly sized buffer
+        length = _GetWindowTextLengthW(hwnd)
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        _GetWindowTextW(hwnd, buffer, length + 1)
+        return buffer.value
     except Exception:
         pass
     return ""
 
 
-def _get_monitor_rects() -> List[Tuple[int, int, int, int, int, int]]:
-    """Enumerate all monitors once. Returns list of (left, top, right, bottom, left, top).
+class _MonitorLayout(NamedTuple):
+    """One EnumDisplayMonitors sweep, in the shapes the callers need."""
+    rects: List[Tuple[int, int, int, int]]  # (left, top, right, bottom)
+    positions: FrozenSet[Tuple[int, int]]   # Monitor origins
+    # Origins of monitors whose work area starts at the monitor origin, i.e.
+    # no taskbar/appbar on the top or left edge. WINDOWPLACEMENT rects are in
+    # workspace coordinates, which only match SetWindowPos screen coordinates
+    # on these monitors.
+    aligned: FrozenSet[Tuple[int, int]]
+
+
+# Monitor layout cache: (timestamp, _MonitorLayout). Save/move/restore in one
+# profile switch share a sweep; apply_profile invalidates after display changes.
+MONITOR_LAYOUT_TTL = 2.0
+_monitor_layout_cache: Optional[Tuple[float, _MonitorLayout]] = None
+
+
+def invalidate_monitor_cache() -> None:
+    """Drop the cached monitor layout (call after changing display settings)."""
+    global _monitor_layout_cache
+    _monitor_layout_cache = None
+
+
+def _get_monitor_layout() -> _MonitorLayout:
+    """Get the monitor layout, enumerating monitors if the cache is stale."""
+    global _monitor_layout_cache
+    cached = _monitor_layout_cache
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < MONITOR_LAYOUT_TTL:
+        return cached[1]
+
+    rects = []
+    aligned = []
+    mi = MONITORINFO()
+    mi.cbSize = ctypes.sizeof(mi)
+
+    def callback(hmonitor):
+        if _GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
+            r, work = mi.rcMonitor, mi.rcWork
+            rects.append((r.left, r.top, r.right, r.bottom))
+            if work.left == r.left and work.top == r.top:
+                aligned.append((r.left, r.top))
+        return True
 
-    Last two values are the monitor origin (same as left, top) for convenience.
-    """
-    monitors = []
+    _enum_monitors(callback)
+    layout = _MonitorLayout(rects, frozenset((left, top) for left, top, _, _ in rects),
+                            frozenset(aligned))
+    _monitor_layout_cache = (now, layout)
+    return layout
 
-    def callback(hmonitor, hdc, lprect, lparam):
-        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(_mi_struct)):
-            r = _mi_struct.rcMonitor
-            monitors.append((r.left, r.top, r.right, r.bottom))
-        return True
 
-    user32.EnumDisplayMonitors(None, None, MonitorEnumProc(callback), 0)
-    return monitors
+def _get_monitor_rects() -> List[Tuple[int, int, int, int]]:
+    """Get all monitor rects as (left, top, right, bottom). Shared; don't modify."""
+    return _get_monitor_layout().rects
 
 
 def _find_monitor_for_point(cx: int, cy: int,
-                             monitor_rects: List[Tuple[int, int, int, int]]) -> Tuple[int, int]:
-    """Find which monitor contains the given point using pre-enumerated rects."""
+                             monitor_rects: List[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int]]:
+    """Find which monitor contains the given point using pre-enumerated rects.
+
+    Returns None if no monitor contains the point (e.g. off-screen windows).
+    """
     for left, top, right, bottom in monitor_rects:
         if left <= cx < right and top <= cy < bottom:
             return (left, top)
-    return (0, 0)
+    return None
 
 
 def get_window_monitor_pos(hwnd: int) -> tuple:
     """Get the monitor position (left, top) for a window."""
-    hmonitor = user32.MonitorFromWindow(hwnd, MONITOR_DEFAULTTONEAREST)
+    hmonitor = _MonitorFromWindow(hwnd, MONITOR_DEFAULTTONEAREST)
     if hmonitor:
-        mi = MONITORINFO()
-        mi.cbSize = ctypes.sizeof(mi)
-        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
+        mi = _thread_monitor_info()
+        if _GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
             return (mi.rcMonitor.left, mi.rcMonitor.top)
     return (0, 0)
 
@@ -252,11 +449,10 @@ def get_window_monitor_pos(hwnd: int) -> tuple:
 def get_primary_monitor_rect() -> tuple:
     """Get the primary monitor's work area (x, y, width, height)."""
     pt = POINT(0, 0)
-    hmonitor = user32.MonitorFromPoint(pt, MONITOR_DEFAULTTOPRIMARY)
+    hmonitor = _MonitorFromPoint(pt, MONITOR_DEFAULTTOPRIMARY)
     if hmonitor:
-        mi = MONITORINFO()
-        mi.cbSize = ctypes.sizeof(mi)
-        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
+        mi = _thread_monitor_info()
+        if _GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
             return (
                 mi.rcWork.left,
                 mi.rcWork.top,
@@ -270,118 +466,171 @@ def _enum_all_visible_hwnds() -> List[int]:
     """Enumerate all visible top-level window handles (minimal filtering)."""
     windows = []
 
-    def enum_callback(hwnd, lParam):
-        if not user32.IsWindowVisible(hwnd):
+    def enum_callback(hwnd):
+        if not _IsWindowVisible(hwnd):
             return True
 
         # Quick style check (no API calls beyond GetWindowLong)
-        ex_style = user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+        ex_style = _GetWindowLongPtr(hwnd, GWL_EXSTYLE)
         if ex_style & WS_EX_TOOLWINDOW and not (ex_style & WS_EX_APPWINDOW):
             return True
 
         windows.append(hwnd)
         return True
 
-    user32.EnumWindows(EnumWindowsProc(enum_callback), 0)
+    _enum_windows(enum_callback)
+    return windows
+
+
+def _enum_user_windows(make: Optional[Callable[[int, str, str], Any]] = None) -> List[Any]:
+    """Enumerate visible user windows with full filtering in one EnumWindows pass.
+
+    Title and process name are fetched once per window, inside the callback.
+
+    Args:
+        make: Optional make(hwnd, title, process_name) run inside the callback
+              for each window that passes the filters; its non-None results
+              are collected instead of the raw tuples.
+
+    Returns:
+        List of (hwnd, title, process_name), or of make()'s results
+    """
+    windows = []
+
+    # Bind everything the callback touches to closure locals: it runs once per
+    # top-level window, so global and attribute lookups add up
+    is_visible = _IsWindowVisible
+    get_style = _GetWindowLongPtr
+    get_title = get_window_title
+    get_thread_pid = _GetWindowThreadProcessId
+    pid_dword = _pid_dword
+    pid_ref = ctypes.byref(pid_dword)
+    pid_cache = _pid_cache
+    sweep_start = time.monotonic()
+    pid_ttl = PID_CACHE_TTL
+    # Drop entries for processes that have expired (mostly exited ones) so the
+    # cache stays bounded by what recent sweeps actually saw
+    for pid in [pid for pid, (ts, _) in pid_cache.items() if sweep_start - ts >= pid_ttl]:
+        del pid_cache[pid]
+    process_by_pid = _get_process_name_by_pid
+    skip_titles = SKIP_TITLES
+    skip_processes = SKIP_PROCESSES
+    append = windows.append
+
+    def enum_callback(hwnd):
+        try:
+            if not is_visible(hwnd):
+                return True
+            ex_style = get_style(hwnd, GWL_EXSTYLE)
+            if ex_style & WS_EX_TOOLWINDOW and not (ex_style & WS_EX_APPWINDOW):
+                return True
+
+            title = get_title(hwnd)
+            if not title or title in skip_titles:
+                return True
+            get_thread_pid(hwnd, pid_ref)
+            pid = pid_dword.value
+            # Processes resolved within PID_CACHE_TTL are a plain dict hit;
+            # OpenProcess runs at most once per unique PID
+            cached = pid_cache.get(pid)
+            if cached is not None and sweep_start - cached[0] < pid_ttl:
+                process_name = cached[1]
+            else:
+                process_name = process_by_pid(pid)
+            if process_name in skip_processes:
+                return True
+
+            if make is None:
+                append((hwnd, title, process_name))
+            else:
+                item = make(hwnd, title, process_name)
+                if item is not None:
+                    append(item)
+        except Exception:
+            pass
+        return True
+
+    _enum_windows(enum_callback)
     return windows
 
 
+def _position_builder(monitor_rects: List[Tuple[int, int, int, int]]
+                      ) -> Callable[[int, str, str], Optional[WindowPosition]]:
+    """Make a build(hwnd, title, process_name) -> WindowPosition (None on failure).
+
+    Uses the shared _wp_struct, so call it from the enumerating thread only.
+    """
+    # Bound once rather than looked up per window: the placement call and a
+    # reusable byref() to _wp_struct
+    get_placement = _GetWindowPlacement
+    wp = _wp_struct
+    wp_ref = ctypes.byref(wp)
+    unpack = _unpack_placement
+    find_monitor = _find_monitor_for_point
+
+    def build(hwnd: int, title: str, process_name: str) -> Optional[WindowPosition]:
+        if not get_placement(hwnd, wp_ref):
+            return None
+        state, left, top, right, bottom = unpack(wp, _WP_STATE_OFFSET)
+
+        # Coordinate-based monitor lookup (no API call)
+        cx = (left + right) // 2
+        cy = (top + bottom) // 2
+        # Fallback for off-screen windows: ask Windows for the nearest monitor
+        monitor_x, monitor_y = (find_monitor(cx, cy, monitor_rects)
+                                or get_window_monitor_pos(hwnd))
+
+        # Positional, in field order (see WindowPosition)
+        return WindowPosition(hwnd, title, process_name, left, top,
+                              right - left, bottom - top, state,
+                              monitor_x, monitor_y)
+
+    return build
+
+
 def get_window_positions() -> List[WindowPosition]:
     """Get positions of all visible windows.
 
     Optimized:
-    - Enumerates windows once
+    - Enumerates, filters and captures windows in a single EnumWindows pass
+      (no intermediate hwnd list)
     - Caches process names by PID
     - Retrieves title/process only once per window
     - Pre-enumerates monitor rects for coordinate-based lookup (no per-window API calls)
     - Uses QueryFullProcessImageNameW (lower permissions)
     - Reuses ctypes buffers
     """
-    global _pid_cache
-    _pid_cache = {}  # Fresh cache per call
-
     # Pre-enumerate monitor rects once (eliminates 2 API calls per window)
-    monitor_rects = _get_monitor_rects()
-
-    positions = []
-
-    for hwnd in _enum_all_visible_hwnds():
-        try:
-            # Get title first (cheap) for filtering
-            title = get_window_title(hwnd)
-            if not title:
-                continue
-            if title in SKIP_TITLES:
-                continue
-
-            # Get process name (cached by PID)
-            pid = _get_pid(hwnd)
-            process_name = _get_process_name_by_pid(pid)
-            if process_name in SKIP_PROCESSES:
-                continue
-
-            # Get window placement (reuse struct)
-            if not user32.GetWindowPlacement(hwnd, ctypes.byref(_wp_struct)):
-                continue
-
-            rect = _wp_struct.rcNormalPosition
-
-            # Coordinate-based monitor lookup (no API call)
-            cx = (rect.left + rect.right) // 2
-            cy = (rect.top + rect.bottom) // 2
-            monitor_x, monitor_y = _find_monitor_for_point(cx, cy, monitor_rects)
-
-            # Fallback for minimized/off-screen windows
-            if monitor_x == 0 and monitor_y == 0 and monitor_rects:
-                first = monitor_rects[0]
-                if not (first[0] == 0 and first[1] == 0):
-                    # (0,0) isn't a real monitor origin, use MonitorFromWindow
-                    monitor_x, monitor_y = get_window_monitor_pos(hwnd)
-
-            pos = WindowPosition(
-                hwnd=hwnd,
-                title=title,
-                process_name=process_name,
-                x=rect.left,
-                y=rect.top,
-                width=rect.right - rect.left,
-                height=rect.bottom - rect.top,
-                state=_wp_struct.showCmd,
-                monitor_x=monitor_x,
-                monitor_y=monitor_y,
-            )
-            positions.append(pos)
-        except Exception:
-            continue
-
-    return positions
+    return _enum_user_windows(_position_builder(_get_monitor_rects()))
 
 
 def get_all_windows() -> List[int]:
     """Get all visible user windows (uses full filtering)."""
-    global _pid_cache
-    _pid_cache = {}
+    return [hwnd for hwnd, _, _ in _enum_user_windows()]
 
-    windows = []
-    for hwnd in _enum_all_visible_hwnds():
-        title = get_window_title(hwnd)
-        if not title or title in SKIP_TITLES:
-            continue
-        process_name = _get_process_name_by_pid(_get_pid(hwnd))
-        if process_name in SKIP_PROCESSES:
-            continue
-        windows.append(hwnd)
-    return windows
+
+# Digest of the last cache payload written by this process
+_last_saved_digest: Optional[bytes] = None
 
 
 def save_positions_cache(positions: List[WindowPosition]) -> bool:
-    """Save window positions to cache file."""
+    """Save window positions to cache file.
+
+    Skips the write when the positions match the last save. Otherwise writes
+    a temp file and swaps it into place, so a crash never leaves a torn cache.
+    """
+    global _last_saved_digest
     try:
-        data = {
-            "positions": [p.to_dict() for p in positions]
-        }
-        with open(get_cache_path(), "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Plain tuples keep the format independent of the class layout
+        payload = pickle.dumps([p.to_tuple() for p in positions], protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.blake2b(payload).digest()
+        path = get_cache_path()
+        if digest == _last_saved_digest and path.exists():
+            return True
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        _last_saved_digest = digest
         return True
     except Exception:
         return False
@@ -392,9 +641,9 @@ def load_positions_cache() -> List[WindowPosition]:
     try:
         path = get_cache_path()
         if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return [WindowPosition.from_dict(p) for p in data.get("positions", [])]
+            with open(path, "rb") as f:
+                snapshot = pickle.load(f)
+            return [WindowPosition(*values) for values in snapshot]
     except Exception:
         pass
     return []
@@ -405,12 +654,31 @@ def is_position_on_monitor(x: int, y: int, monitor_x: int, monitor_y: int) -> bo
     return True  # Will be refined when we have the actual monitor list
 
 
+# Batches smaller than this run serially; pool startup would dominate
+PARALLEL_BATCH_THRESHOLD = 8
+
+
+def _count_successes(func: Callable[[Any], bool], items: list) -> int:
+    """Call func on each item and count the truthy results.
+
+    Win32 window calls release the GIL and SetWindowPlacement can stall on a
+    busy target window, so larger batches run on a thread pool.
+    """
+    if len(items) < PARALLEL_BATCH_THRESHOLD:
+        return sum(1 for item in items if func(item))
+    workers = min(32, (os.cpu_count() or 1) * 4, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(1 for ok in pool.map(func, items) if ok)
+
+
 def _move_window_to_primary(hwnd: int, primary_rect: Tuple[int, int, int, int]) -> bool:
     """Move a window to the primary monitor (with pre-fetched primary rect)."""
     try:
-        wp = WINDOWPLACEMENT()
-        wp.length = ctypes.sizeof(wp)
-        if not user32.GetWindowPlacement(hwnd, ctypes.byref(wp)):
+        # SetWindowPlacement waits on the owning thread; don't stall on hung apps
+        if _IsHungAppWindow(hwnd):
+            return False
+        wp = _thread_placement()
+        if not _GetWindowPlacement(hwnd, ctypes.byref(wp)):
             return False
 
         rect = wp.rcNormalPosition
@@ -432,7 +700,7 @@ def _move_window_to_primary(hwnd: int, primary_rect: Tuple[int, int, int, int])
         wp.rcNormalPosition.right = new_x + width
         wp.rcNormalPosition.bottom = new_y + height
 
-        return bool(user32.SetWindowPlacement(hwnd, ctypes.byref(wp)))
+        return bool(_SetWindowPlacement(hwnd, ctypes.byref(wp)))
     except Exception:
         return False
 
@@ -467,12 +735,10 @@ def move_windows_from_monitors(monitor_positions: Set[Tuple[int, int]]) -> int:
     if not monitor_positions:
         return 0
 
-    # Cache primary rect once for the entire batch
-    primary_rect = get_primary_monitor_rect()
     # Pre-enumerate monitor rects for coordinate lookup
     monitor_rects = _get_monitor_rects()
 
-    moved = 0
+    to_move = []
     for hwnd in _enum_all_visible_hwnds():
         try:
             title = get_window_title(hwnd)
@@ -480,56 +746,70 @@ def move_windows_from_monitors(monitor_positions: Set[Tuple[int, int]]) -> int:
                 continue
 
             # Coordinate-based monitor lookup
-            if not user32.GetWindowPlacement(hwnd, ctypes.byref(_wp_struct)):
+            if not _GetWindowPlacement(hwnd, ctypes.byref(_wp_struct)):
                 continue
-            rect = _wp_struct.rcNormalPosition
-            cx = (rect.left + rect.right) // 2
-            cy = (rect.top + rect.bottom) // 2
-            win_mon = _find_monitor_for_point(cx, cy, monitor_rects)
+            _, left, top, right, bottom = _unpack_placement(_wp_struct, _WP_STATE_OFFSET)
+            cx = (left + right) // 2
+            cy = (top + bottom) // 2
+            win_mon = _find_monitor_for_point(cx, cy, monitor_rects) or get_window_monitor_pos(hwnd)
 
             if win_mon in monitor_positions:
-                if _move_window_to_primary(hwnd, primary_rect):
-                    moved += 1
+                to_move.append(hwnd)
         except Exception:
             continue
-    return moved
+    if not to_move:
+        return 0
+
+    # Fetch the primary work area once for the entire batch
+    primary_rect = get_primary_monitor_rect()
+    return _count_successes(lambda hwnd: _move_window_to_primary(hwnd, primary_rect), to_move)
+
+
+# Last (title, process_name) -> hwnd map: (monotonic time built, lookup)
+_window_lookup_cache: Optional[Tuple[float, Dict[Tuple[str, str], int]]] = None
+WINDOW_LOOKUP_TTL = 1.0
+
+
+def invalidate_window_lookup() -> None:
+    """Force the next build_window_lookup() to re-enumerate windows."""
+    global _window_lookup_cache
+    _window_lookup_cache = None
 
 
 def build_window_lookup() -> Dict[Tuple[str, str], int]:
     """Build a (title, process_name) -> hwnd lookup map in a single pass.
 
     Used by batch restore to avoid re-enumerating all windows per restore target.
+    When several windows share a title and process, the first one in z-order
+    (topmost) is kept. A map built within WINDOW_LOOKUP_TTL seconds is reused
+    (shared, so don't modify it).
     """
-    global _pid_cache
-    _pid_cache = {}
+    global _window_lookup_cache
+    cached = _window_lookup_cache
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < WINDOW_LOOKUP_TTL:
+        return cached[1]
 
     lookup: Dict[Tuple[str, str], int] = {}
-    for hwnd in _enum_all_visible_hwnds():
-        try:
-            title = get_window_title(hwnd)
-            if not title:
-                continue
-            process_name = _get_process_name_by_pid(_get_pid(hwnd))
-            lookup[(title, process_name)] = hwnd
-        except Exception:
-            continue
+    for hwnd, title, process_name in _enum_user_windows():
+        lookup.setdefault((title, process_name), hwnd)
+    _window_lookup_cache = (now, lookup)
     return lookup
 
 
 def find_window_by_title_and_process(title: str, process_name: str) -> Optional[int]:
-    """Find a window by title and process name."""
-    for hwnd in _enum_all_visible_hwnds():
-        try:
-            if get_window_title(hwnd) == title and get_process_name(hwnd) == process_name:
-                return hwnd
-        except Exception:
-            continue
-    return None
+    """Find a window by title and process name (topmost match)."""
+    return build_window_lookup().get((title, process_name))
+
 
+def get_available_monitor_positions() -> FrozenSet[Tuple[int, int]]:
+    """Get set of all available monitor positions (cached monitor sweep)."""
+    return _get_monitor_layout().positions
 
-def get_available_monitor_positions() -> Set[Tuple[int, int]]:
-    """Get set of all available monitor positions. Single enumeration."""
-    return {(left, top) for left, top, _, _ in _get_monitor_rects()}
+
+def _get_aligned_monitor_positions() -> FrozenSet[Tuple[int, int]]:
+    """Get positions of monitors where workspace == screen coordinates."""
+    return _get_monitor_layout().aligned
 
 
 def is_monitor_available(monitor_x: int, monitor_y: int) -> bool:
@@ -538,8 +818,9 @@ def is_monitor_available(monitor_x: int, monitor_y: int) -> bool:
 
 
 def restore_window_position(saved: WindowPosition,
-                             available_monitors: Optional[Set[Tuple[int, int]]] = None,
-                             window_lookup: Optional[Dict[Tuple[str, str], int]] = None) -> bool:
+                             available_monitors: Optional[AbstractSet[Tuple[int, int]]] = None,
+                             window_lookup: Optional[Dict[Tuple[str, str], int]] = None,
+                             aligned_monitors: Optional[AbstractSet[Tuple[int, int]]] = None) -> bool:
     """Restore a single window to its saved position.
 
     Args:
@@ -547,14 +828,18 @@ def restore_window_position(saved: WindowPosition,
         available_monitors: Pre-fetched set of (x, y) monitor positions.
                            If None, will query monitors (slower).
         window_lookup: Pre-built (title, process_name)->hwnd map.
-                      If None, falls back to full enumeration (slower).
+                      If None, uses build_window_lookup() (cached briefly).
+        aligned_monitors: Pre-fetched _get_aligned_monitor_positions(). Normal
+                          windows restored onto one of these are moved with a
+                          single SetWindowPos. If None, always uses
+                          SetWindowPlacement.
 
     Returns True if restored, False if skipped/failed.
     """
     try:
         hwnd = saved.hwnd
-        if not user32.IsWindow(hwnd):
-            # Use pre-built lookup map (O(1)) or fall back to full scan (O(N))
+        if not _IsWindow(hwnd):
+            # Use the pre-built lookup map, or the shared short-lived one
             if window_lookup is not None:
                 hwnd = window_lookup.get((saved.title, saved.process_name), 0)
             else:
@@ -570,19 +855,30 @@ def restore_window_position(saved: WindowPosition,
             if not is_monitor_available(saved.monitor_x, saved.monitor_y):
                 return False
 
-        wp = WINDOWPLACEMENT()
-        wp.length = ctypes.sizeof(wp)
+        # SetWindowPlacement waits on the owning thread; don't stall on hung apps
+        if _IsHungAppWindow(hwnd):
+            return False
 
-        if not user32.GetWindowPlacement(hwnd, ctypes.byref(wp)):
+        wp = _thread_placement()
+        if not _GetWindowPlacement(hwnd, ctypes.byref(wp)):
             return False
 
+        # Normal -> normal on a monitor where workspace == screen coordinates:
+        # a plain move/resize, no placement state to update
+        if (saved.state == SW_SHOWNORMAL and wp.showCmd == SW_SHOWNORMAL
+                and aligned_monitors is not None
+                and (saved.monitor_x, saved.monitor_y) in aligned_monitors):
+            return bool(_SetWindowPos(hwnd, None, saved.x, saved.y,
+                                      saved.width, saved.height,
+                                      SWP_NOZORDER | SWP_NOACTIVATE))
+
         wp.showCmd = saved.state
         wp.rcNormalPosition.left = saved.x
         wp.rcNormalPosition.top = saved.y
         wp.rcNormalPosition.right = saved.x + saved.width
         wp.rcNormalPosition.bottom = saved.y + saved.height
 
-        return bool(user32.SetWindowPlacement(hwnd, ctypes.byref(wp)))
+        return bool(_SetWindowPlacement(hwnd, ctypes.byref(wp)))
     except Exception:
         return False
 
@@ -600,25 +896,26 @@ def restore_window_positions(saved_positions: List[WindowPosition],
     """
     # Pre-fetch available monitors and window lookup map once
     available_monitors = get_available_monitor_positions()
+    aligned_monitors = _get_aligned_monitor_positions()
     wl = build_window_lookup()
 
-    restored = 0
-    for saved in saved_positions:
-        if skip_minimized and saved.state == SW_SHOWMINIMIZED:
-            continue
-        if restore_window_position(saved, available_monitors=available_monitors, window_lookup=wl):
-            restored += 1
-    return restored
+    targets = [saved for saved in saved_positions
+               if not (skip_minimized and saved.state == SW_SHOWMINIMIZED)]
+    return _count_successes(
+        lambda saved: restore_window_position(
+            saved, available_monitors=available_monitors, window_lookup=wl,
+            aligned_monitors=aligned_monitors),
+        targets)
 
 
 def get_monitors_info() -> List[Dict]:
     """Get information about all monitors."""
     monitors = []
+    mi = MONITORINFO()
+    mi.cbSize = ctypes.sizeof(mi)
 
-    def monitor_enum_callback(hmonitor, hdc, lprect, lparam):
-        mi = MONITORINFO()
-        mi.cbSize = ctypes.sizeof(mi)
-        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
+    def monitor_enum_callback(hmonitor):
+        if _GetMonitorInfoW(hmonitor, ctypes.byref(mi)):
             monitors.append({
                 "x": mi.rcMonitor.left,
                 "y": mi.rcMonitor.top,
@@ -628,14 +925,18 @@ def get_monitors_info() -> List[Dict]:
             })
         return True
 
-    user32.EnumDisplayMonitors(None, None, MonitorEnumProc(monitor_enum_callback), 0)
+    _enum_monitors(monitor_enum_callback)
 
     return monitors
 
 
+def _ascii_safe(text: str, limit: int = 50) -> str:
+    """Truncate text for console output, replacing non-ASCII characters."""
+    # Slice first: 'replace' maps each character to one '?', so lengths match
+    return text[:limit].encode('ascii', 'replace').decode('ascii')
+
+
 if __name__ == "__main__":
-    import sys
-    import time
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
     print("=" * 60)
@@ -652,10 +953,13 @@ if __name__ == "__main__":
     start = time.perf_counter()
     positions = get_window_positions()
     elapsed = time.perf_counter() - start
+    # Format everything after timing, then write it in one call
+    lines = []
     for p in positions:
-        title = p.title[:50].encode('ascii', 'replace').decode('ascii')
-        print(f"  [{p.process_name}] {title}")
-        print(f"    Position: ({p.x}, {p.y}) Size: {p.width}x{p.height}")
-        print(f"    Monitor: ({p.monitor_x}, {p.monitor_y}) State: {p.state}")
-        print()
+        lines.append(f"  [{p.process_name}] {_ascii_safe(p.title)}")
+        lines.append(f"    Position: ({p.x}, {p.y}) Size: {p.width}x{p.height}")
+        lines.append(f"    Monitor: ({p.monitor_x}, {p.monitor_y}) State: {p.state}")
+        lines.append("")
+    if lines:
+        print("\n".join(lines))
     print(f"Retrieved {len(positions)} windows in {elapsed*1000:.1f}ms")